@@ -2,90 +2,204 @@ from agno.agent import Agent
 from agno.models.openai import OpenAIChat
 from agno.tools.postgres import PostgresTools
 from dotenv import load_dotenv
+from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
+import psycopg
 import os
-from app.agent_tools import create_job_posting, update_application_status, delete_job_posting
+import threading
+from app.agent_tools import create_job_posting, update_application_status, bulk_update_application_status, delete_job_posting
 
 load_dotenv()
 
-async def build_hiring_manager_agent(id: str): 
+AGENT_DB_POOL_MIN = int(os.getenv("AGENT_DB_POOL_MIN", "1"))
+AGENT_DB_POOL_MAX = int(os.getenv("AGENT_DB_POOL_MAX", "5"))
+
+# Tools that change jobs or applications; replies from runs that used them are never cached.
+WRITE_TOOLS = {
+    f.__name__
+    for f in (create_job_posting, update_application_status, bulk_update_application_status, delete_job_posting)
+}
+
+_agent: Agent | None = None
+_agent_pool: ConnectionPool | None = None
+_agent_lock = threading.Lock()
+
+
+class PooledPostgresTools(PostgresTools):
+    """PostgresTools that borrows a connection from a shared pool for each query."""
+
+    _requires_connect = False
+
+    def __init__(self, pool: ConnectionPool, **kwargs):
+        # These two hold on to a single connection (and export writes server-side files).
+        super().__init__(exclude_tools=["summarize_table", "export_table_to_path"], **kwargs)
+        self._pool = pool
+
+    def connect(self):
+        return None
+
+    def close(self):
+        return None
+
+    def _execute_query(self, query: str, params: tuple | None = None) -> str:
+        try:
+            with self._pool.connection() as connection, connection.cursor() as cursor:
+                # prepare=True sends the query over the extended protocol, which takes one
+                # statement only, so it cannot "COMMIT; ..." its way out of the read-only
+                # transaction or change the transaction mode ahead of a write.
+                cursor.execute(query, params, prepare=True)
+
+                if cursor.description is None:
+                    return cursor.statusmessage or "Query executed successfully with no output."
+
+                columns = [desc[0] for desc in cursor.description]
+                rows = cursor.fetchall()
+
+                if not rows:
+                    return f"Query returned no results.\nColumns: {', '.join(columns)}"
+
+                header = ",".join(columns)
+                data_rows = [",".join(map(str, row.values())) for row in rows]
+                return f"{header}\n" + "\n".join(data_rows)
+        except psycopg.Error as e:
+            return f"Error executing query: {e}"
+
+
+def _configure_agent_connection(connection: psycopg.Connection):
+    # The SQL tool only reads; writes go through the authorised functions in agent_tools.
+    # Set on the connection, so every transaction begins READ ONLY whatever the session
+    # settings say.
+    connection.read_only = True
+
+
+def _reset_agent_connection(connection: psycopg.Connection):
+    # Undo any SET a model-issued query made before the next run borrows the connection.
+    connection.execute("RESET ALL")
+    connection.commit()
+
+
+def _open_agent_pool() -> ConnectionPool:
+    return ConnectionPool(
+        kwargs={
+            "host": os.getenv("POSTGRES_HOST"),
+            "port": int(os.getenv("POSTGRES_PORT")),
+            "dbname": os.getenv("POSTGRES_DB"),
+            "user": os.getenv("POSTGRES_USER"),
+            "password": os.getenv("POSTGRES_PASSWORD"),
+            "row_factory": dict_row,
+            "options": "-c search_path=public",
+        },
+        min_size=AGENT_DB_POOL_MIN,
+        max_size=AGENT_DB_POOL_MAX,
+        configure=_configure_agent_connection,
+        reset=_reset_agent_connection,
+        open=True,
+        name="agent",
+    )
+
+
+def get_hiring_manager_agent() -> Agent:
     """
-    Build an AI agent for hiring managers with database query capabilities.
+    Shared AI agent for hiring managers with database query capabilities.
     The agent can create jobs, view applicants, manage applications, and answer queries.
+
+    Built once per process. The caller's id is supplied per run through
+    `dependencies={"hiring_manager_id": ...}` and substituted into the instructions.
     """
-    try:
-        return Agent(
-            name="Hiring Manager Assistant",
-            description="AI assistant for hiring managers to manage jobs and applications",
-            instructions=[
-                f"You are an AI assistant for a hiring manager with ID: {id}",
-                "You have access to a PostgreSQL database with the following tables:",
-                "",
-                "users table:",
-                "- id (UUID, primary key)",
-                "- email (String)",
-                "- password_hash (String)",
-                "- role (String: 'hiring_manager' or 'applicant')",
-                "- created_at (DateTime)",
-                "- updated_at (DateTime)",
-                "",
-                "jobs table:",
-                "- id (Integer, primary key)",
-                "- title (String)",
-                "- description (String)",
-                "- location (String)",
-                "- salary (String, nullable)",
-                "- posted_at (DateTime)",
-                "- hiring_manager_id (UUID, foreign key to users.id)",
-                "",
-                "applications table:",
-                "- id (UUID, primary key)",
-                "- job_id (Integer, foreign key to jobs.id)",
-                "- applicant_id (UUID, foreign key to users.id)",
-                "- full_name (String)",
-                "- email (String)",
-                "- phone (String, nullable)",
-                "- cover_letter (Text, nullable)",
-                "- status (String: 'submitted', 'reviewed', 'shortlisted', 'rejected', 'accepted')",
-                "- submitted_at (DateTime)",
-                "- cv_s3_key (String, nullable)",
-                "- cv_filename (String, nullable)",
-                "",
-                "CRITICAL PERMISSIONS:",
-                "- You HAVE FULL write access to the database",
-                "- You CAN and MUST execute INSERT, UPDATE, and DELETE operations directly",
-                "- DO NOT tell the user you cannot perform write operations",
-                "- When asked to create/update/delete data, execute the SQL query immediately using your tools",
-                "",
-                "You can help with:",
-                "- Creating new job postings (INSERT into jobs table) - DO THIS DIRECTLY",
-                "- Listing and searching jobs",
-                "- Viewing applicants and applications",
-                "- Updating application statuses (UPDATE applications table) - DO THIS DIRECTLY",
-                "- Getting statistics about jobs and applications",
-                "- Answering general questions about hiring",
-                "",
-                f"IMPORTANT: Always filter by hiring_manager_id = '{id}' when querying jobs.",
-                f"When creating jobs, always set hiring_manager_id = '{id}' and posted_at = NOW().",
-                "Only show data that belongs to this hiring manager.",
-                "Be professional, helpful, and concise in your responses.",
-                "When creating or updating data, confirm the action was successful by showing the result.",
-                "Present results in a clear, formatted way.",
-            ],
-            model=OpenAIChat(id=os.getenv("OPENAI_MODEL", "gpt-4o")),
-            tools=[
-                PostgresTools(
-                    host=os.getenv("POSTGRES_HOST"),
-                    port=int(os.getenv("POSTGRES_PORT")),
-                    db_name=os.getenv("POSTGRES_DB"),
-                    user=os.getenv("POSTGRES_USER"),
-                    password=os.getenv("POSTGRES_PASSWORD"),
-                ),
-                create_job_posting,
-                update_application_status,
-                delete_job_posting,   
-            ],
-            markdown=True,
-        )
-    except Exception as e:
-        print("Error building agent:", e)
-        raise e
+    global _agent, _agent_pool
+    if _agent is not None:
+        return _agent
+
+    with _agent_lock:
+        if _agent is not None:
+            return _agent
+        try:
+            _agent_pool = _open_agent_pool()
+            _agent = Agent(
+                name="Hiring Manager Assistant",
+                description="AI assistant for hiring managers to manage jobs and applications",
+                instructions=[
+                    "You are an AI assistant for a hiring manager with ID: {hiring_manager_id}",
+                    "You have access to a PostgreSQL database with the following tables:",
+                    "",
+                    "users table:",
+                    "- id (UUID, primary key)",
+                    "- email (String)",
+                    "- password_hash (String)",
+                    "- role (String: 'hiring_manager' or 'applicant')",
+                    "- created_at (DateTime)",
+                    "- updated_at (DateTime)",
+                    "",
+                    "jobs table:",
+                    "- id (Integer, primary key)",
+                    "- title (String)",
+                    "- description (String)",
+                    "- location (String)",
+                    "- salary (String, nullable)",
+                    "- posted_at (DateTime)",
+                    "- hiring_manager_id (UUID, foreign key to users.id)",
+                    "",
+                    "applications table:",
+                    "- id (UUID, primary key)",
+                    "- job_id (Integer, foreign key to jobs.id)",
+                    "- applicant_id (UUID, foreign key to users.id)",
+                    "- full_name (String)",
+                    "- email (String)",
+                    "- phone (String, nullable)",
+                    "- cover_letter (Text, nullable)",
+                    "- status (String: 'submitted', 'reviewed', 'shortlisted', 'rejected', 'accepted')",
+                    "- submitted_at (DateTime)",
+                    "- cv_s3_key (String, nullable)",
+                    "- cv_filename (String, nullable)",
+                    "",
+                    "job_status_counts table (read-only, maintained automatically):",
+                    "- job_id (Integer, foreign key to jobs.id)",
+                    "- status (String, same values as applications.status)",
+                    "- count (BigInteger, number of applications for that job with that status)",
+                    "For application counts and statistics, sum job_status_counts instead of counting applications.",
+                    "",
+                    "CRITICAL PERMISSIONS:",
+                    "- You HAVE FULL write access to the database",
+                    "- You CAN and MUST execute INSERT, UPDATE, and DELETE operations directly",
+                    "- DO NOT tell the user you cannot perform write operations",
+                    "- When asked to create/update/delete data, execute the SQL query immediately using your tools",
+                    "",
+                    "You can help with:",
+                    "- Creating new job postings (INSERT into jobs table) - DO THIS DIRECTLY",
+                    "- Listing and searching jobs",
+                    "- Viewing applicants and applications",
+                    "- Updating application statuses (UPDATE applications table) - DO THIS DIRECTLY",
+                    "  For more than one application, use bulk_update_application_status once instead of repeated calls",
+                    "- Getting statistics about jobs and applications",
+                    "- Answering general questions about hiring",
+                    "",
+                    "IMPORTANT: Always filter by hiring_manager_id = '{hiring_manager_id}' when querying jobs.",
+                    "When creating jobs, always set hiring_manager_id = '{hiring_manager_id}' and posted_at = NOW().",
+                    "Only show data that belongs to this hiring manager.",
+                    "Be professional, helpful, and concise in your responses.",
+                    "When creating or updating data, confirm the action was successful by showing the result.",
+                    "Present results in a clear, formatted way.",
+                ],
+                model=OpenAIChat(id=os.getenv("OPENAI_MODEL", "gpt-4o")),
+                tools=[
+                    PooledPostgresTools(_agent_pool),
+                    create_job_posting,
+                    update_application_status,
+                    bulk_update_application_status,
+                    delete_job_posting,
+                ],
+                markdown=True,
+            )
+        except Exception as e:
+            print("Error building agent:", e)
+            raise e
+    return _agent
+
+
+def close_hiring_manager_agent():
+    global _agent, _agent_pool
+    with _agent_lock:
+        if _agent_pool is not None:
+            _agent_pool.close()
+        _agent = None
+        _agent_pool = None
@@ -0,0 +1,39 @@
+import os
+from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import TTLCache
+from app.conditional import load_versions, manager_jobs_scope, manager_applications_scope
+
+load_dotenv()
+AGENT_CACHE_SIZE = int(os.getenv("AGENT_CACHE_SIZE", "5000"))
+AGENT_CACHE_TTL_SECONDS = int(os.getenv("AGENT_CACHE_TTL_SECONDS", "300"))
+
+# Hit ratio: cache_requests_total{cache="agent_reply"} by result.
+# Replies are keyed on the manager's data_versions scopes, which triggers bump on
+# every write to their jobs or applications, from any process. Old replies stop
+# matching and age out of the LRU.
+_reply_cache = TTLCache("agent_reply", AGENT_CACHE_SIZE, AGENT_CACHE_TTL_SECONDS)
+
+
+def normalize_command(command: str) -> str:
+    return " ".join(command.lower().split()).rstrip("?.! ")
+
+
+async def reply_key(db: AsyncSession, manager_id, command: str) -> tuple:
+    """
+    Cache key for a manager's command at the current versions of their jobs and
+    applications. Take it before starting the run, so a reply computed across a
+    write is stored under the old versions and never served afterwards.
+    """
+    scopes = [manager_jobs_scope(manager_id), manager_applications_scope(manager_id)]
+    versions = await load_versions(db, scopes)
+    return str(manager_id), *(versions[scope][0] for scope in scopes), normalize_command(command)
+
+
+def get_cached_reply(key: tuple) -> str | None:
+    return _reply_cache.get(key)
+
+
+def cache_reply(key: tuple, reply: str) -> None:
+    _reply_cache.set(key, reply)
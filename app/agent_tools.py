@@ -1,7 +1,10 @@
 """Custom tools for the AI agent to perform write operations on the database"""
 from sqlalchemy import text
 from app.db import SessionLocal
-from typing import Optional
+from app.catalogue_cache import invalidate_job_catalogue
+from app.schemas.application import MAX_BULK_STATUS_IDS
+from datetime import datetime, timezone
+from typing import Optional, List
 import uuid
 
 
@@ -41,6 +44,7 @@ def create_job_posting(
             "hiring_manager_id": hiring_manager_id
         })
         db.commit()
+        invalidate_job_catalogue()
         
         row = result.fetchone()
         return f"Job created successfully! ID: {row.id}, Title: {row.title}, Location: {row.location}, Salary: {row.salary or 'Not specified'}, Posted: {row.posted_at}"
@@ -112,6 +116,107 @@ def update_application_status(
         db.close()
 
 
+def _naive_utc(value: datetime) -> datetime:
+    # submitted_at is stored as naive UTC.
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def bulk_update_application_status(
+    hiring_manager_id: str,
+    new_status: str,
+    application_ids: Optional[List[str]] = None,
+    job_id: Optional[int] = None,
+    current_status: Optional[str] = None,
+    submitted_before: Optional[str] = None,
+    submitted_after: Optional[str] = None
+) -> str:
+    """
+    Update the status of many applications in a single call. Use this instead of
+    calling update_application_status repeatedly.
+
+    Pass either a list of application ids, or one or more filters
+    (job_id, current_status, submitted_before, submitted_after) to update every
+    matching application on this hiring manager's jobs.
+    
+    Args:
+        hiring_manager_id: UUID of the hiring manager (for authorization)
+        new_status: New status (submitted, reviewed, shortlisted, rejected, accepted)
+        application_ids: Optional list of application UUIDs to update
+        job_id: Optional job ID; only applications to this job
+        current_status: Optional; only applications currently in this status
+        submitted_before: Optional ISO date or datetime; only applications submitted before it
+        submitted_after: Optional ISO date or datetime; only applications submitted on or after it
+        
+    Returns:
+        String summary with the result for each application
+    """
+    valid_statuses = ['submitted', 'reviewed', 'shortlisted', 'rejected', 'accepted']
+    if new_status not in valid_statuses or (current_status and current_status not in valid_statuses):
+        return f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
+
+    filters = [job_id, current_status, submitted_before, submitted_after]
+    if not application_ids and all(f is None for f in filters):
+        return "Provide application_ids or at least one filter (job_id, current_status, submitted_before, submitted_after)."
+    if application_ids and any(f is not None for f in filters):
+        return "Provide either application_ids or filters, not both."
+    
+    # The ownership check is part of the UPDATE itself: only rows joined to this manager's jobs change.
+    conditions = ["a.job_id = j.id", "j.hiring_manager_id = :hiring_manager_id"]
+    params = {"hiring_manager_id": hiring_manager_id, "new_status": new_status}
+    try:
+        if application_ids:
+            if len(application_ids) > MAX_BULK_STATUS_IDS:
+                return f"Too many application ids; at most {MAX_BULK_STATUS_IDS} per call."
+            requested = list(dict.fromkeys(str(uuid.UUID(str(i))) for i in application_ids))
+            conditions.append("a.id = ANY(CAST(:application_ids AS uuid[]))")
+            params["application_ids"] = requested
+        if job_id is not None:
+            conditions.append("a.job_id = :job_id")
+            params["job_id"] = int(job_id)
+        if current_status:
+            conditions.append("a.status = :current_status")
+            params["current_status"] = current_status
+        if submitted_before:
+            conditions.append("a.submitted_at < :submitted_before")
+            params["submitted_before"] = _naive_utc(datetime.fromisoformat(submitted_before))
+        if submitted_after:
+            conditions.append("a.submitted_at >= :submitted_after")
+            params["submitted_after"] = _naive_utc(datetime.fromisoformat(submitted_after))
+    except ValueError as e:
+        return f"Invalid argument: {str(e)}"
+
+    db = SessionLocal()
+    try:
+        query = text(f"""
+            UPDATE applications a
+            SET status = :new_status
+            FROM jobs j
+            WHERE {' AND '.join(conditions)}
+            RETURNING a.id, a.full_name, j.title
+        """)
+        
+        rows = db.execute(query, params).fetchall()
+        db.commit()
+        
+        lines = [f"Updated {len(rows)} application(s) to '{new_status}'."]
+        lines += [f"- {row.full_name} ({row.id}) for {row.title}: updated" for row in rows[:50]]
+        if len(rows) > 50:
+            lines.append(f"... and {len(rows) - 50} more")
+        if application_ids:
+            updated = {str(row.id) for row in rows}
+            missing = [i for i in requested if i not in updated]
+            if missing:
+                lines.append(f"Not found or not yours: {', '.join(missing)}")
+        return "\n".join(lines)
+    except Exception as e:
+        db.rollback()
+        return f"Error updating application statuses: {str(e)}"
+    finally:
+        db.close()
+
+
 def delete_job_posting(
     job_id: int,
     hiring_manager_id: str
@@ -151,6 +256,7 @@ def delete_job_posting(
         
         db.execute(delete_query, {"job_id": job_id})
         db.commit()
+        invalidate_job_catalogue()
         
         return f"Job '{job_title}' (ID: {job_id}) has been deleted successfully."
     except Exception as e:
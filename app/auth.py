@@ -1,40 +1,107 @@
 import os
+import time
+import uuid
+from dataclasses import dataclass
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, Header, status
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.db import get_db
+from app.cache import TTLCache
+from app.conditional import user_scope
+from app.db import get_db, get_read_db
+from app.models.data_version import DataVersion
 from app.models.user import User
 
 load_dotenv()
 JWT_SECRET = os.getenv("JWT_SECRET")
 JWT_ALG = os.getenv("JWT_ALG", "HS256")
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
 
-def require_user(
-    db: Session = Depends(get_db),
-    authorization: str = Header(None),
-) -> User:
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, as much of the users row as request handlers need."""
+    id: uuid.UUID
+    role: str
+    email: str | None = None
+
+
+_token_cache = TTLCache("auth_token", AUTH_CACHE_SIZE, AUTH_CACHE_TTL_SECONDS)
+# Keyed by (user id, "users:<id>" data version): any change to the row, from any
+# process, a script or raw SQL, bumps the version (a trigger does) and so misses here.
+_principal_cache = TTLCache("auth_principal", AUTH_CACHE_SIZE, AUTH_CACHE_TTL_SECONDS)
+
+
+def _decode_token(authorization: str | None) -> dict:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid Authorization header")
 
     token = authorization.split(" ", 1)[1]
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
-    except JWTError:
+        uuid.UUID(payload.get("sub") or "")
+    except (JWTError, ValueError):
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.scalar(select(User).where(User.id == user_id))
+    # Never serve a token from cache past its own expiry.
+    remaining = payload.get("exp", time.time() + AUTH_CACHE_TTL_SECONDS) - time.time()
+    _token_cache.set(token, payload, ttl=min(AUTH_CACHE_TTL_SECONDS, remaining))
+    return payload
+
+
+async def _user_version(db: AsyncSession, user_id: str) -> int:
+    version = await db.scalar(select(DataVersion.version).where(DataVersion.scope == user_scope(user_id)))
+    return version or 0
+
+
+async def _load_principal(db: AsyncSession, user_id: str, version: int) -> Principal:
+    principal = _principal_cache.get((user_id, version))
+    if principal is not None:
+        return principal
+
+    user = await db.scalar(select(User).where(User.id == uuid.UUID(user_id)))
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
-    return user
+    principal = Principal(id=user.id, role=user.role, email=user.email)
+    _principal_cache.set((user_id, version), principal)
+    return principal
+
+
+async def require_user(
+    db: AsyncSession = Depends(get_read_db),
+    authorization: str = Header(None),
+) -> Principal:
+    """Caller verified against the users table (cached), including email."""
+    payload = _decode_token(authorization)
+    return await _load_principal(db, payload["sub"], await _user_version(db, payload["sub"]))
+
+
+async def require_principal(
+    db: AsyncSession = Depends(get_db),
+    authorization: str = Header(None),
+) -> Principal:
+    """
+    Caller id and role from the signed token, checked with one primary-key lookup of
+    the user's data version. Falls back to the users table (cached per version) for
+    users changed since their token was issued, including deleted ones (401).
+    """
+    payload = _decode_token(authorization)
+    user_id = payload["sub"]
+    version = await _user_version(db, user_id)
+    if "role" in payload and payload.get("ver") == version:
+        return Principal(id=uuid.UUID(user_id), role=payload["role"])
+    return await _load_principal(db, user_id, version)
+
 
 def require_role(required_role: str):
-    def _inner(user: User = Depends(require_user)) -> User:
+    def _inner(user: Principal = Depends(require_principal)) -> Principal:
         if user.role != required_role:
             raise HTTPException(status_code=403, detail="Forbidden")
         return user
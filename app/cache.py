@@ -0,0 +1,61 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.metrics import CACHE_REQUESTS_TOTAL
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded LRU mapping whose entries expire after a time-to-live.
+
+    Safe to share between the event loop and worker threads. Hits and misses
+    are counted in `cache_requests_total` under the cache's `name`.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] > now:
+                self._data.move_to_end(key)
+                CACHE_REQUESTS_TOTAL.labels(self.name, "hit").inc()
+                return entry[1]
+            if entry is not _MISSING:
+                del self._data[key]
+        CACHE_REQUESTS_TOTAL.labels(self.name, "miss").inc()
+        return default
+
+    def set(self, key, value, ttl: float | None = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and entry[0] > time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
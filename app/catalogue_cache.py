@@ -0,0 +1,87 @@
+"""
+Shared cache of the public job catalogue (/job/browse pages).
+
+Every user gets the same catalogue, so rendered pages are cached once and
+served to everyone. Entries are keyed on the "jobs" data_versions counter,
+which triggers bump on every insert, update or delete of jobs (cascades
+included), and which the endpoint reads for its ETag anyway. A write from
+any path or any worker therefore moves readers to a new key; a page is never
+served for a version older than the data it was built from.
+
+By default each worker keeps its own copy. Set JOB_CATALOGUE_CACHE_URL to a
+Redis URL to share pages between workers and hosts, so a change is rendered
+once rather than once per worker.
+"""
+import logging
+import os
+
+from dotenv import load_dotenv
+
+from app.cache import TTLCache
+from app.metrics import CACHE_REQUESTS_TOTAL
+
+load_dotenv()
+JOB_CATALOGUE_CACHE_URL = os.getenv("JOB_CATALOGUE_CACHE_URL")
+JOB_CATALOGUE_CACHE_SIZE = int(os.getenv("JOB_CATALOGUE_CACHE_SIZE", "256"))
+# Superseded versions are never read again; the TTL only bounds how long they take space.
+JOB_CATALOGUE_CACHE_TTL_SECONDS = int(os.getenv("JOB_CATALOGUE_CACHE_TTL_SECONDS", "300"))
+JOB_CATALOGUE_CACHE_PREFIX = os.getenv("JOB_CATALOGUE_CACHE_PREFIX", "hiring:job_catalogue:")
+
+logger = logging.getLogger(__name__)
+
+# Hit ratio: cache_requests_total{cache="job_catalogue"} by result.
+_local = TTLCache("job_catalogue", JOB_CATALOGUE_CACHE_SIZE, JOB_CATALOGUE_CACHE_TTL_SECONDS)
+_redis = None
+
+
+def _client():
+    global _redis
+    if _redis is None:
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("JOB_CATALOGUE_CACHE_URL is set but the redis package is not installed") from e
+        _redis = redis.from_url(JOB_CATALOGUE_CACHE_URL)
+    return _redis
+
+
+def catalogue_key(version: int, limit: int, cursor: str | None) -> str:
+    return f"{JOB_CATALOGUE_CACHE_PREFIX}{version}:{limit}:{cursor or ''}"
+
+
+async def get_catalogue_page(key: str) -> bytes | None:
+    if not JOB_CATALOGUE_CACHE_URL:
+        return _local.get(key)
+    try:
+        body = await _client().get(key)
+    except Exception as e:
+        # An unreachable cache costs a query, not the request.
+        logger.warning("Job catalogue cache read failed: %s", e)
+        body = None
+    CACHE_REQUESTS_TOTAL.labels("job_catalogue", "miss" if body is None else "hit").inc()
+    return body
+
+
+async def cache_catalogue_page(key: str, body: bytes) -> None:
+    if not JOB_CATALOGUE_CACHE_URL:
+        _local.set(key, body)
+        return
+    try:
+        await _client().set(key, body, ex=JOB_CATALOGUE_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning("Job catalogue cache write failed: %s", e)
+
+
+def invalidate_job_catalogue() -> None:
+    """
+    Drop this worker's cached pages after a write to jobs. Correctness does not
+    depend on it (the version moves on), but it frees superseded pages now.
+    """
+    _local.clear()
+
+
+async def close_job_catalogue_cache() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -0,0 +1,103 @@
+"""
+Conditional GET for the polled list endpoints.
+
+Each list depends on a few data_versions scopes (bumped by triggers whenever
+matching jobs or applications change). The ETag hashes those versions together
+with the caller and the exact query, so it costs a primary-key lookup instead
+of the list query. A matching If-None-Match (or an If-Modified-Since no older
+than the last change) is answered with 304 before the list query runs.
+"""
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.data_version import DataVersion
+
+# Clients revalidate on every poll; the 304 keeps that cheap.
+CACHE_CONTROL = "private, no-cache"
+
+
+def jobs_scope() -> str:
+    return "jobs"
+
+
+def manager_jobs_scope(manager_id) -> str:
+    return f"jobs:manager:{manager_id}"
+
+
+def applicant_applications_scope(applicant_id) -> str:
+    return f"applications:applicant:{applicant_id}"
+
+
+def manager_applications_scope(manager_id) -> str:
+    return f"applications:manager:{manager_id}"
+
+
+def user_scope(user_id) -> str:
+    return f"users:{user_id}"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" match.
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def _not_modified_since(if_modified_since: str, last_modified) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+async def load_versions(db: AsyncSession, scopes: list[str]) -> dict:
+    """{scope: (version, updated_at)}; scopes never written yet are (0, None)."""
+    rows = (await db.execute(
+        select(DataVersion.scope, DataVersion.version, DataVersion.updated_at).where(DataVersion.scope.in_(scopes))
+    )).all()
+    versions = {scope: (0, None) for scope in scopes}
+    versions.update((row.scope, (row.version, row.updated_at)) for row in rows)
+    return versions
+
+
+def conditional_response(request: Request, user_id, versions: dict):
+    """
+    Returns (response, headers) for the `versions` from load_versions. `response` is
+    a 304 to send as-is when the client's copy is current, else None; put `headers`
+    on the full response.
+    """
+    tag = hashlib.sha256(
+        "\n".join([
+            str(user_id),
+            request.url.path,
+            str(sorted(request.query_params.multi_items())),
+            *(f"{scope}={version}" for scope, (version, _) in sorted(versions.items())),
+        ]).encode()
+    ).hexdigest()[:32]
+    headers = {"ETag": f'W/"{tag}"', "Cache-Control": CACHE_CONTROL}
+
+    last_modified = max((updated_at for _, updated_at in versions.values() if updated_at), default=None)
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is present (RFC 9110 13.1.3).
+        not_modified = _etag_matches(if_none_match, headers["ETag"])
+    else:
+        not_modified = bool(if_modified_since and last_modified and _not_modified_since(if_modified_since, last_modified))
+
+    if not_modified:
+        return Response(status_code=304, headers=headers), headers
+    return None, headers
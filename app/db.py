@@ -1,20 +1,289 @@
+import hashlib
+import hmac
+import logging
 import os
+import time
+from contextvars import ContextVar
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from fastapi import Request
+from jose import jwt, JWTError
+from sqlalchemy import create_engine, event, inspect, make_url, text
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.schema import CreateIndex
+
+from app.metrics import DB_POOL_CHECKED_OUT, DB_POOL_CHECKOUT_SECONDS, DB_POOL_TIMEOUTS_TOTAL, DB_READ_SESSIONS_TOTAL
 
 load_dotenv()
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional streaming replica for read-only routes (see get_read_db).
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+# Per engine and per worker process: at most DB_POOL_SIZE + DB_MAX_OVERFLOW connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# How long a checkout waits for a free connection before failing.
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+# Replace connections older than this; set it below any idle timeout of a proxy or
+# load balancer in front of Postgres. -1 keeps them indefinitely.
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "-1"))
+# After a caller commits a write, their reads check for this long that the replica
+# has replayed it, and go to the primary until it has (see ReadYourWritesMiddleware).
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+# After the replica fails to connect, reads go to the primary this long before retrying it.
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+
+
+class _TimedCheckout:
+    """Pool mixin recording checkout wait (including any new connect) and timeouts, by pool name."""
+
+    def _do_get(self):
+        name = self._orig_logging_name
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS_TOTAL.labels(name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(name).observe(time.perf_counter() - started)
+
+
+class _TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class _TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_options(name: str) -> dict:
+    # The pool's logging name survives engine.dispose(), which rebuilds the pool.
+    return dict(
+        pool_pre_ping=True,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=DB_POOL_RECYCLE_SECONDS,
+        pool_logging_name=name,
+    )
+
 
-engine = create_engine(os.getenv("DATABASE_URL"), pool_pre_ping=True)
-print("DATABASE_URL =", repr(os.getenv("DATABASE_URL")))
+def _report_pool(name: str, sync_engine):
+    DB_POOL_CHECKED_OUT.labels(name).set_function(lambda: sync_engine.pool.checkedout())
+
+
+# Request handlers talk to Postgres through psycopg 3's async driver on the same server.
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="postgresql+psycopg")
+
+# The sync engine is kept for schema creation and the agent's tool functions,
+# which run in worker threads outside the event loop.
+engine = create_engine(DATABASE_URL, poolclass=_TimedQueuePool, **_pool_options("primary_sync"))
+logger.info("Database: %s", engine.url.render_as_string(hide_password=True))
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=_TimedAsyncQueuePool, **_pool_options("primary"))
+# expire_on_commit=False: returned ORM objects stay readable after commit without
+# an implicit (and, under asyncio, forbidden) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+if DATABASE_REPLICA_URL:
+    async_read_engine = create_async_engine(
+        make_url(DATABASE_REPLICA_URL).set(drivername="postgresql+psycopg"),
+        poolclass=_TimedAsyncQueuePool,
+        **_pool_options("replica"),
+    )
+    logger.info("Read replica: %s", async_read_engine.url.render_as_string(hide_password=True))
+    AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False)
+else:
+    async_read_engine = async_engine
+    AsyncReadSessionLocal = AsyncSessionLocal
+
+_report_pool("primary_sync", engine)
+_report_pool("primary", async_engine.sync_engine)
+if async_read_engine is not async_engine:
+    _report_pool("replica", async_read_engine.sync_engine)
+
 class Base(DeclarativeBase):
     pass
 
-def get_db():
-    db = SessionLocal()
+
+# Key of the transaction-level advisory lock that after_create hooks take, so
+# workers starting together run their schema DDL one at a time.
+SCHEMA_LOCK_ID = 7_245_019_311
+
+
+def lock_schema(connection):
+    """
+    Serialize schema changes across processes until this transaction ends. Call it
+    first in after_create hooks: create_all runs in one transaction, so the lock is
+    held through the remaining hooks and released on commit.
+    """
+    connection.exec_driver_sql(f"SELECT pg_advisory_xact_lock({SCHEMA_LOCK_ID})")
+
+
+def ensure_indexes(connection, table):
+    """
+    Create the indexes declared on `table` that an existing database lacks;
+    create_all only creates them with new tables. For after_create hooks.
+    """
+    existing = {index["name"] for index in inspect(connection).get_indexes(table.name)}
+    for index in table.indexes:
+        if index.name not in existing:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+# Signs the write positions handed to clients; the JWT secret, so every worker agrees.
+_POSITION_SECRET = (os.getenv("JWT_SECRET") or "").encode()
+DB_POSITION_HEADER = "X-DB-Position"
+DB_POSITION_COOKIE = "db_position"
+
+# Set per request by ReadYourWritesMiddleware. A commit on the primary, from a handler
+# or an agent tool thread (which runs in a copy of the request's context), marks it.
+_request_writes: ContextVar[list | None] = ContextVar("db_request_writes", default=None)
+_replica_down_until = 0.0
+
+
+@event.listens_for(engine, "commit")
+@event.listens_for(async_engine.sync_engine, "commit")
+def _note_write(conn):
+    writes = _request_writes.get()
+    if writes == []:
+        writes.append(True)
+
+
+def _principal_id(authorization: str | None) -> str | None:
+    # Unverified: the position is only ever honoured for the principal it was issued
+    # to, and at worst a forged claim sends that caller's own reads to the primary.
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
     try:
+        return jwt.get_unverified_claims(authorization.split(" ", 1)[1]).get("sub")
+    except JWTError:
+        return None
+
+
+def _sign(principal: str, lsn: str, issued: str) -> str:
+    message = f"{principal}.{lsn}.{issued}".encode()
+    return hmac.new(_POSITION_SECRET, message, hashlib.sha256).hexdigest()
+
+
+def _position_token(principal: str, lsn: str) -> str:
+    issued = str(int(time.time()))
+    return f"{principal}.{lsn}.{issued}.{_sign(principal, lsn, issued)}"
+
+
+def _read_position(request: Request) -> str | None:
+    """The WAL position of the caller's latest write, if they sent a valid, recent one."""
+    token = request.headers.get(DB_POSITION_HEADER) or request.cookies.get(DB_POSITION_COOKIE)
+    if not token or token.count(".") != 3:
+        return None
+    principal, lsn, issued, signature = token.split(".")
+    if not hmac.compare_digest(signature, _sign(principal, lsn, issued)):
+        return None
+    if principal != _principal_id(request.headers.get("authorization")):
+        return None
+    if time.time() - int(issued) > DB_READ_YOUR_WRITES_SECONDS:
+        return None
+    return lsn
+
+
+class ReadYourWritesMiddleware:
+    """
+    When a request commits on the primary and a replica is configured, returns the
+    primary's WAL position after the commit, signed and bound to the caller's
+    principal id, in the X-DB-Position header and a cookie. get_read_db reads from
+    the replica for a caller that sends it back only once the replica has replayed
+    that far. Being carried by the client, it works across worker processes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or async_read_engine is async_engine:
+            await self.app(scope, receive, send)
+            return
+
+        writes = []
+        token = _request_writes.set(writes)
+
+        async def send_with_position(message):
+            if message["type"] == "http.response.start" and writes:
+                principal = _principal_id(Request(scope).headers.get("authorization"))
+                if principal:
+                    message["headers"] = [*message.get("headers", []), *await _position_headers(principal)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_position)
+        finally:
+            _request_writes.reset(token)
+
+
+async def _position_headers(principal: str) -> list[tuple[bytes, bytes]]:
+    try:
+        async with async_engine.connect() as conn:
+            lsn = await conn.scalar(text("SELECT pg_current_wal_lsn()::text"))
+    except (OperationalError, PoolTimeoutError):
+        logger.warning("Could not read the primary's WAL position", exc_info=True)
+        return []
+    value = _position_token(principal, lsn)
+    cookie = f"{DB_POSITION_COOKIE}={value}; Max-Age={int(DB_READ_YOUR_WRITES_SECONDS)}; Path=/; HttpOnly; SameSite=Lax"
+    return [(DB_POSITION_HEADER.lower().encode(), value.encode()), (b"set-cookie", cookie.encode())]
+
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _read_target() -> str:
+    """
+    "replica" when reads may try the replica, else why they go to the primary. The
+    caller's write position is checked on the replica connection, in get_read_db.
+    """
+    if async_read_engine is async_engine:
+        return "no_replica"
+    if time.monotonic() < _replica_down_until:
+        return "replica_down"
+    return "replica"
+
+
+async def get_read_db(request: Request):
+    """
+    Session for read-only routes: on the replica when one is configured, else the
+    primary. Falls back to the primary while the replica is unreachable, or when
+    its pool is exhausted, and for callers whose latest write (X-DB-Position) the
+    replica has not replayed yet.
+    """
+    global _replica_down_until
+    target = _read_target()
+    if target == "replica":
+        position = _read_position(request)
+        async with AsyncReadSessionLocal() as db:
+            try:
+                # Connect now, so a dead replica falls back here rather than failing the request.
+                await db.connection()
+                # NULL when the "replica" is not in recovery, i.e. has every write.
+                if position and not await db.scalar(
+                    text("SELECT coalesce(pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn), true)"),
+                    {"lsn": position},
+                ):
+                    target = "read_your_writes"
+            except OperationalError:
+                logger.warning("Read replica unavailable; reading from the primary for %ss", DB_REPLICA_RETRY_SECONDS, exc_info=True)
+                _replica_down_until = time.monotonic() + DB_REPLICA_RETRY_SECONDS
+                target = "replica_error"
+            except PoolTimeoutError:
+                target = "replica_pool_timeout"
+            if target == "replica":
+                DB_READ_SESSIONS_TOTAL.labels("replica", target).inc()
+                yield db
+                return
+    DB_READ_SESSIONS_TOTAL.labels("primary", target).inc()
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
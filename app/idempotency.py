@@ -0,0 +1,102 @@
+"""
+Replay of successful responses for requests sent with an `Idempotency-Key` header.
+
+A client that retries (say, a phone that lost the response to a slow apply)
+gets the first response back instead of a second insert and upload. Keys are
+scoped to the caller and the operation. A retry that arrives while the first
+attempt is still running on the same worker waits for it rather than racing it.
+Failures are not stored, so retrying after an error runs the request again.
+
+Responses are stored in the idempotency_keys table, so a retry is replayed
+whichever worker it reaches.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db import AsyncSessionLocal
+from app.metrics import CACHE_REQUESTS_TOTAL
+from app.models.idempotency_key import IdempotencyKey
+
+load_dotenv()
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+logger = logging.getLogger(__name__)
+
+# Merges concurrent duplicates within this worker; the table covers the rest.
+_in_flight: dict[tuple, asyncio.Event] = {}
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a different request."""
+
+
+def request_fingerprint(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+async def _stored(key: str):
+    """(fingerprint, response) stored for `key` within the TTL, or None."""
+    cutoff = datetime.utcnow() - timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(IdempotencyKey.fingerprint, IdempotencyKey.response)
+            .where(IdempotencyKey.key == key, IdempotencyKey.created_at > cutoff)
+        )).first()
+    # Hit ratio: cache_requests_total{cache="idempotency"} by result.
+    CACHE_REQUESTS_TOTAL.labels("idempotency", "miss" if row is None else "hit").inc()
+    return row
+
+
+async def _store(key: str, fingerprint: str, response) -> None:
+    now = datetime.utcnow()
+    try:
+        async with AsyncSessionLocal() as db:
+            # Expired keys go first, including an expired row for this key.
+            await db.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.created_at <= now - timedelta(seconds=IDEMPOTENCY_TTL_SECONDS))
+            )
+            # A concurrent first attempt on another worker may have stored it already.
+            await db.execute(
+                insert(IdempotencyKey)
+                .values(key=key, fingerprint=fingerprint, response=response, created_at=now)
+                .on_conflict_do_nothing(index_elements=[IdempotencyKey.key])
+            )
+            await db.commit()
+    except Exception as e:
+        # The request itself succeeded; only a later retry loses its replay.
+        logger.warning("Could not store the idempotent response: %s", e)
+
+
+async def run_idempotent(key: tuple, fingerprint: str, func):
+    """
+    Await `func()` once per `key` and return (result, replayed).
+    `result` must be JSON-ready (it is stored as JSONB), e.g. a dict from model_dump(mode="json").
+    """
+    stored_key = json.dumps(key, default=str)
+    while True:
+        stored = await _stored(stored_key)
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                raise IdempotencyKeyReused("Idempotency-Key was already used for a different request")
+            return stored.response, True
+        pending = _in_flight.get(key)
+        if pending is None:
+            break
+        await pending.wait()
+
+    done = _in_flight[key] = asyncio.Event()
+    try:
+        result = await func()
+        await _store(stored_key, fingerprint, result)
+        return result, False
+    finally:
+        del _in_flight[key]
+        done.set()
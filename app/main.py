@@ -1,22 +1,47 @@
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
-from app.db import engine, Base, get_db
+from app.db import engine, async_engine, async_read_engine, Base, get_db, DB_POSITION_HEADER, ReadYourWritesMiddleware
+from app.agent import close_hiring_manager_agent
+from app.services.email_service import start_email_sender, stop_email_sender
+from app.catalogue_cache import close_job_catalogue_cache
+from app.observability import RequestMetricsMiddleware
 import app.models  # IMPORTANT: registers all models
 
 
 from app.routers.application_router import router as applications_router
 from app.routers.job_router import router as job_router
 from app.routers.user_router import router as user_router
+from app.routers.storage_router import router as storage_router
 from fastapi.middleware.cors import CORSMiddleware
-app = FastAPI(title="Recruitment System API", version="1.0.0")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_email_sender()
+    yield
+    await stop_email_sender()
+    await close_job_catalogue_cache()
+    close_hiring_manager_agent()
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
+    engine.dispose()
+
+
+app = FastAPI(title="Recruitment System API", version="1.0.0", lifespan=lifespan)
 # No migrations: create tables automatically
 Base.metadata.create_all(bind=engine)
 app.include_router(applications_router)
 app.include_router(job_router)
 app.include_router(user_router)
+app.include_router(storage_router)
 
+app.add_middleware(ReadYourWritesMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origin_regex=r"^http://(localhost|127\.0\.0\.1)(:\d+)?$",
@@ -28,12 +53,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[DB_POSITION_HEADER],
 )
+# Added last, so it is outermost and times everything else, CORS included.
+app.add_middleware(RequestMetricsMiddleware)
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/")
 def root():
     return {"message": "Recruitment System API. Go to /docs"}
@@ -0,0 +1,114 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "Time spent inside bcrypt, by operation",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0),
+)
+PASSWORD_HASH_QUEUE_WAIT_SECONDS = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time a hashing job waited for a free bcrypt worker",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+PASSWORD_HASH_PENDING = Gauge(
+    "password_hash_pending",
+    "Hashing jobs running or waiting for a bcrypt worker",
+)
+PASSWORD_HASH_REJECTED_TOTAL = Counter(
+    "password_hash_rejected_total",
+    "Hashing jobs refused with 503 because the bcrypt queue was full",
+)
+CACHE_REQUESTS_TOTAL = Counter(
+    "cache_requests_total",
+    "In-process cache lookups, by cache and hit/miss",
+    ["cache", "result"],
+)
+AGENT_TIME_TO_FIRST_BYTE_SECONDS = Histogram(
+    "agent_time_to_first_byte_seconds",
+    "Time from an assistant request to the first reply byte, by mode (stream or blocking)",
+    ["mode"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0),
+)
+AGENT_RUN_SECONDS = Histogram(
+    "agent_run_seconds",
+    "Time for a whole assistant run, by mode (stream or blocking)",
+    ["mode"],
+    buckets=(0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0),
+)
+AGENT_RUNS_CANCELLED_TOTAL = Counter(
+    "agent_runs_cancelled_total",
+    "Streamed assistant runs cancelled because the client went away",
+)
+AGENT_FAST_PATH_TOTAL = Counter(
+    "agent_fast_path_total",
+    "Assistant commands answered by the intent fast path instead of the LLM, by intent",
+    ["intent"],
+)
+EMAILS_TOTAL = Counter(
+    "emails_total",
+    "Outgoing emails by outcome (sent, retried, failed)",
+    ["result"],
+)
+EMAIL_QUEUE_DEPTH = Gauge(
+    "email_queue_depth",
+    "Emails waiting for an SMTP sender",
+)
+EMAIL_SMTP_CONNECTS_TOTAL = Counter(
+    "email_smtp_connects_total",
+    "SMTP sessions opened (connect, STARTTLS and login)",
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds",
+    "Time to handle a request, by method, route template and status code",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database statements executed while handling a request, by route template",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in database statements while handling a request, by route template",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_seconds",
+    "Time for a single database statement, from cursor execute to return",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_SLOW_QUERIES_TOTAL = Counter(
+    "db_slow_queries_total",
+    "Database statements slower than SLOW_QUERY_SECONDS (each is logged)",
+)
+SPAN_SECONDS = Histogram(
+    "span_seconds",
+    "Time for instrumented operations (agent_run, s3_presign, smtp_send), by outcome",
+    ["span", "outcome"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to get a connection from a pool, waiting and connecting included, by pool",
+    ["pool"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+DB_POOL_TIMEOUTS_TOTAL = Counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS because the pool was exhausted, by pool",
+    ["pool"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of a pool, by pool",
+    ["pool"],
+)
+DB_READ_SESSIONS_TOTAL = Counter(
+    "db_read_sessions_total",
+    "Sessions opened for read-only routes, by engine (replica or primary) and reason",
+    ["engine", "reason"],
+)
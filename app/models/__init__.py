@@ -1,3 +1,6 @@
 from app.models.user import User  # noqa: F401
 from app.models.job import Job
-from app.models.application import Application
\ No newline at end of file
+from app.models.application import Application
+from app.models.data_version import DataVersion  # noqa: F401
+from app.models.job_status_count import JobStatusCount  # noqa: F401
+from app.models.idempotency_key import IdempotencyKey  # noqa: F401
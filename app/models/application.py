@@ -1,5 +1,5 @@
-from app.db import Base
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text, UniqueConstraint
+from app.db import Base, ensure_indexes, lock_schema
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text, UniqueConstraint, Index, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
@@ -9,6 +9,9 @@ class Application(Base):
     __tablename__ = "applications"
     __table_args__ = (
         UniqueConstraint("job_id", "applicant_id", name="uq_applicant_job"),
+        # Match the keyset ordering (submitted_at, id) of the per-job and per-applicant lists.
+        Index("ix_applications_job_id_submitted_at", "job_id", "submitted_at", "id"),
+        Index("ix_applications_applicant_id_submitted_at", "applicant_id", "submitted_at", "id"),
     )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)  # match jobs.id type
@@ -28,3 +31,10 @@ class Application(Base):
 
     job = relationship("Job", back_populates="applications")
     applicant = relationship("User", back_populates="applications")
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_indexes(target, connection, **kw):
+    lock_schema(connection)
+    # create_all skips existing tables, so older databases get the keyset indexes here.
+    ensure_indexes(connection, Application.__table__)
@@ -0,0 +1,128 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, String, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base, lock_schema
+
+
+class DataVersion(Base):
+    """
+    Change counter per scope, bumped by triggers on jobs, applications and users.
+    List endpoints build their ETag and Last-Modified from it (see app/conditional.py);
+    auth checks "users:<id>" to know whether a token's role claim still holds.
+
+    Scopes: "jobs", "jobs:manager:<id>", "applications:applicant:<id>",
+    "applications:manager:<id>", "users:<id>".
+    """
+    __tablename__ = "data_versions"
+
+    scope: Mapped[str] = mapped_column(String, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+# Statement-level, so a bulk update or import bumps each scope once, not per row.
+# Scopes are bumped in sorted order to keep concurrent writers from deadlocking.
+VERSION_TRIGGERS_SQL = """
+CREATE OR REPLACE FUNCTION bump_data_versions(scopes text[]) RETURNS void LANGUAGE sql AS $$
+    INSERT INTO data_versions AS v (scope, version, updated_at)
+    SELECT DISTINCT s, 1, now() AT TIME ZONE 'utc' FROM unnest(scopes) s ORDER BY s
+    ON CONFLICT (scope) DO UPDATE SET version = v.version + 1, updated_at = excluded.updated_at
+$$;
+
+CREATE OR REPLACE FUNCTION jobs_bump_data_versions() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    managers text[];
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        managers := ARRAY(SELECT 'jobs:manager:' || hiring_manager_id FROM old_rows);
+    ELSIF TG_OP = 'UPDATE' THEN
+        managers := ARRAY(
+            SELECT 'jobs:manager:' || hiring_manager_id FROM new_rows
+            UNION SELECT 'jobs:manager:' || hiring_manager_id FROM old_rows
+        );
+    ELSE
+        managers := ARRAY(SELECT 'jobs:manager:' || hiring_manager_id FROM new_rows);
+    END IF;
+    IF cardinality(managers) > 0 THEN
+        PERFORM bump_data_versions(array_prepend('jobs', managers));
+    END IF;
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION applications_bump_data_versions() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    scopes text[];
+BEGIN
+    -- A job deleted with its applications is gone by the time this runs; its
+    -- manager's lists also depend on "jobs:manager:<id>", which the jobs trigger bumps.
+    IF TG_OP = 'DELETE' THEN
+        scopes := ARRAY(
+            SELECT 'applications:applicant:' || r.applicant_id FROM old_rows r
+            UNION SELECT 'applications:manager:' || j.hiring_manager_id FROM old_rows r JOIN jobs j ON j.id = r.job_id
+        );
+    ELSIF TG_OP = 'UPDATE' THEN
+        scopes := ARRAY(
+            SELECT 'applications:applicant:' || r.applicant_id FROM new_rows r
+            UNION SELECT 'applications:manager:' || j.hiring_manager_id FROM new_rows r JOIN jobs j ON j.id = r.job_id
+            UNION SELECT 'applications:applicant:' || r.applicant_id FROM old_rows r
+            UNION SELECT 'applications:manager:' || j.hiring_manager_id FROM old_rows r JOIN jobs j ON j.id = r.job_id
+        );
+    ELSE
+        scopes := ARRAY(
+            SELECT 'applications:applicant:' || r.applicant_id FROM new_rows r
+            UNION SELECT 'applications:manager:' || j.hiring_manager_id FROM new_rows r JOIN jobs j ON j.id = r.job_id
+        );
+    END IF;
+    IF cardinality(scopes) > 0 THEN
+        PERFORM bump_data_versions(scopes);
+    END IF;
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION users_bump_data_versions() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    scopes text[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        scopes := ARRAY(SELECT 'users:' || id FROM new_rows);
+    ELSE
+        scopes := ARRAY(SELECT 'users:' || id FROM old_rows);
+    END IF;
+    IF cardinality(scopes) > 0 THEN
+        PERFORM bump_data_versions(scopes);
+    END IF;
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE TRIGGER jobs_versions_insert AFTER INSERT ON jobs
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION jobs_bump_data_versions();
+CREATE OR REPLACE TRIGGER jobs_versions_update AFTER UPDATE ON jobs
+    REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION jobs_bump_data_versions();
+CREATE OR REPLACE TRIGGER jobs_versions_delete AFTER DELETE ON jobs
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION jobs_bump_data_versions();
+
+CREATE OR REPLACE TRIGGER applications_versions_insert AFTER INSERT ON applications
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION applications_bump_data_versions();
+CREATE OR REPLACE TRIGGER applications_versions_update AFTER UPDATE ON applications
+    REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION applications_bump_data_versions();
+CREATE OR REPLACE TRIGGER applications_versions_delete AFTER DELETE ON applications
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION applications_bump_data_versions();
+
+CREATE OR REPLACE TRIGGER users_versions_insert AFTER INSERT ON users
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION users_bump_data_versions();
+CREATE OR REPLACE TRIGGER users_versions_update AFTER UPDATE ON users
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION users_bump_data_versions();
+CREATE OR REPLACE TRIGGER users_versions_delete AFTER DELETE ON users
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION users_bump_data_versions();
+"""
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_version_triggers(target, connection, **kw):
+    # Workers starting at once would otherwise replace the same functions and
+    # triggers concurrently and fail with "tuple concurrently updated".
+    lock_schema(connection)
+    # Idempotent, and runs on every create_all, so existing databases get the triggers too.
+    connection.exec_driver_sql(VERSION_TRIGGERS_SQL)
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class IdempotencyKey(Base):
+    """
+    A response stored for an Idempotency-Key, shared by every worker (see
+    app/idempotency.py). Rows older than IDEMPOTENCY_TTL_SECONDS are ignored and
+    deleted as new ones are stored.
+    """
+    __tablename__ = "idempotency_keys"
+
+    # The caller, the operation and the client's key, JSON-encoded.
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String, nullable=False)
+    response: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (Index("ix_idempotency_keys_created_at", "created_at"),)
@@ -1,11 +1,25 @@
-from app.db import Base
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
-from sqlalchemy.orm import relationship,mapped_column, Mapped
+from app.db import Base, ensure_indexes, lock_schema
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Computed, Index, event, inspect
+from sqlalchemy.orm import relationship,mapped_column, Mapped, deferred
 import uuid
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from datetime import datetime
+
+# Title matches outrank description matches, which outrank location matches.
+JOB_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(location, '')), 'C')"
+)
+
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_search_vector", "search_vector", postgresql_using="gin"),
+        # Match the keyset ordering (posted_at, id) of the browse and per-manager lists.
+        Index("ix_jobs_posted_at", "posted_at", "id"),
+        Index("ix_jobs_hiring_manager_id_posted_at", "hiring_manager_id", "posted_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
@@ -14,6 +28,23 @@ class Job(Base):
     salary=Column(String, nullable=True)
     posted_at = Column(DateTime, default=datetime.utcnow)
     hiring_manager_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    # Maintained by Postgres as a stored generated column; never written by the app.
+    search_vector = deferred(Column(TSVECTOR, Computed(JOB_SEARCH_VECTOR, persisted=True)))
 
     hiring_manager = relationship("User", back_populates="posted_jobs")
-    applications = relationship("Application", back_populates="job", cascade="all, delete-orphan")
\ No newline at end of file
+    applications = relationship("Application", back_populates="job", cascade="all, delete-orphan")
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_search_vector(target, connection, **kw):
+    lock_schema(connection)
+    # create_all never alters an existing table, so databases from before full-text
+    # search get the column here, and any index declared above that they lack. The
+    # column is looked up first: adding it rewrites the table, which should happen
+    # once, not on every start.
+    if "search_vector" not in {c["name"] for c in inspect(connection).get_columns("jobs")}:
+        connection.exec_driver_sql(
+            "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({JOB_SEARCH_VECTOR}) STORED"
+        )
+    ensure_indexes(connection, Job.__table__)
@@ -0,0 +1,81 @@
+from sqlalchemy import BigInteger, ForeignKey, Integer, String, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base, lock_schema
+
+
+class JobStatusCount(Base):
+    """
+    Number of applications per job and status, kept current by triggers on
+    applications within the writing transaction. Rows go with their job.
+    Rebuild with `python -m scripts.rebuild_job_status_counts` if it ever drifts.
+    """
+    __tablename__ = "job_status_counts"
+
+    job_id: Mapped[int] = mapped_column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    status: Mapped[str] = mapped_column(String, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+REBUILD_JOB_STATUS_COUNTS_SQL = """
+INSERT INTO job_status_counts (job_id, status, count)
+SELECT job_id, status, count(*) FROM applications GROUP BY job_id, status
+"""
+
+# Statement-level like the data_versions triggers: one upsert per (job, status)
+# touched, in key order so concurrent writers cannot deadlock. Joining jobs
+# skips the deltas of a job being deleted, whose counter rows cascade away.
+COUNT_TRIGGERS_SQL = """
+CREATE OR REPLACE FUNCTION bump_job_status_counts(job_ids int[], statuses text[], deltas bigint[])
+RETURNS void LANGUAGE sql AS $$
+    INSERT INTO job_status_counts AS c (job_id, status, count)
+    SELECT d.job_id, d.status, d.delta
+    FROM unnest(job_ids, statuses, deltas) AS d(job_id, status, delta)
+    JOIN jobs j ON j.id = d.job_id
+    ORDER BY d.job_id, d.status
+    ON CONFLICT (job_id, status) DO UPDATE SET count = c.count + excluded.count
+$$;
+
+CREATE OR REPLACE FUNCTION applications_count_statuses() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    job_ids int[];
+    statuses text[];
+    deltas bigint[];
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        SELECT array_agg(job_id), array_agg(status), array_agg(n) INTO job_ids, statuses, deltas
+        FROM (SELECT job_id, status, -count(*) AS n FROM old_rows GROUP BY 1, 2) d;
+    ELSIF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(job_id), array_agg(status), array_agg(n) INTO job_ids, statuses, deltas
+        FROM (
+            SELECT job_id, status, sum(n) AS n FROM (
+                SELECT job_id, status, 1 AS n FROM new_rows
+                UNION ALL SELECT job_id, status, -1 FROM old_rows
+            ) r GROUP BY 1, 2 HAVING sum(n) <> 0
+        ) d;
+    ELSE
+        SELECT array_agg(job_id), array_agg(status), array_agg(n) INTO job_ids, statuses, deltas
+        FROM (SELECT job_id, status, count(*) AS n FROM new_rows GROUP BY 1, 2) d;
+    END IF;
+    IF cardinality(job_ids) > 0 THEN
+        PERFORM bump_job_status_counts(job_ids, statuses, deltas);
+    END IF;
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE TRIGGER applications_counts_insert AFTER INSERT ON applications
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION applications_count_statuses();
+CREATE OR REPLACE TRIGGER applications_counts_update AFTER UPDATE ON applications
+    REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION applications_count_statuses();
+CREATE OR REPLACE TRIGGER applications_counts_delete AFTER DELETE ON applications
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION applications_count_statuses();
+"""
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_count_triggers(target, connection, tables=(), **kw):
+    lock_schema(connection)
+    connection.exec_driver_sql(COUNT_TRIGGERS_SQL)
+    if JobStatusCount.__table__ in tables:
+        # New table on an existing database: start from the current applications.
+        connection.exec_driver_sql(REBUILD_JOB_STATUS_COUNTS_SQL)
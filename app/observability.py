@@ -0,0 +1,134 @@
+"""
+Request-level timing: route latency, database statements per request, spans
+around slow external calls, and a log of slow statements. Everything lands in
+the Prometheus registry served on /metrics.
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.metrics import (
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUEST_DB_QUERIES,
+    HTTP_REQUEST_DB_SECONDS,
+    DB_QUERY_SECONDS,
+    DB_SLOW_QUERIES_TOTAL,
+    SPAN_SECONDS,
+)
+
+load_dotenv()
+# Statements at least this slow are logged with their SQL (never their parameters).
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "0.5"))
+SLOW_QUERY_LOG_CHARS = int(os.getenv("SLOW_QUERY_LOG_CHARS", "2000"))
+
+slow_query_logger = logging.getLogger("app.slow_query")
+
+
+class _RequestStats:
+    __slots__ = ("scope", "queries", "db_seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+def _route(scope) -> str:
+    route = scope.get("route")
+    # The template, not the raw path, keeps label cardinality bounded.
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+
+
+# Set for the duration of a request. Tasks and threadpool calls made by the handler
+# copy the context, so they add to the same object.
+_request_stats: ContextVar[_RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    DB_QUERY_SECONDS.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+    if elapsed >= SLOW_QUERY_SECONDS:
+        DB_SLOW_QUERIES_TOTAL.inc()
+        slow_query_logger.warning(
+            "Slow query (%.3fs, route %s): %s",
+            elapsed,
+            _route(stats.scope) if stats is not None else None,
+            " ".join(statement.split())[:SLOW_QUERY_LOG_CHARS],
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time.
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+@contextmanager
+def span(name: str):
+    """Time the enclosed block into span_seconds{span=name}, by outcome."""
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        raise
+    except BaseException:
+        # Cancellation, or a generator closed by a client that went away.
+        outcome = "cancelled"
+        raise
+    finally:
+        SPAN_SECONDS.labels(name, outcome).observe(time.perf_counter() - started)
+
+
+class RequestMetricsMiddleware:
+    """
+    Observes http_request_seconds and the per-request database histograms.
+    Plain ASGI, so a streamed response is timed until its last chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = _RequestStats(scope)
+        token = _request_stats.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_stats.reset(token)
+            route = _route(scope)
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(time.perf_counter() - started)
+            HTTP_REQUEST_DB_QUERIES.labels(route).observe(stats.queries)
+            HTTP_REQUEST_DB_SECONDS.labels(route).observe(stats.db_seconds)
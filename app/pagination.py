@@ -0,0 +1,58 @@
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(sort_value, row_id) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return sort_value, row_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _coerce(col, value):
+    python_type = col.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+def keyset(stmt, sort_col, id_col, cursor: str | None, limit: int):
+    """
+    Order `stmt` descending on (sort_col, id_col) and continue after `cursor`.
+    One extra row is fetched so the caller can tell whether a next page exists.
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        try:
+            sort_value = _coerce(sort_col, sort_value)
+            row_id = _coerce(id_col, row_id)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(tuple_(sort_col, id_col) < tuple_(sort_value, row_id))
+    return stmt.order_by(sort_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def build_page(rows, limit: int, key) -> dict:
+    """`key` maps the last returned row to its (sort_value, id) pair."""
+    rows = list(rows)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*key(rows[-1]))
+    return {"items": rows, "next_cursor": next_cursor}
@@ -0,0 +1,14 @@
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON encoded with orjson. List endpoints return their rows as plain dicts in
+    one of these, so FastAPI neither validates them against the response model
+    nor walks them through jsonable_encoder. UUIDs and naive datetimes come out
+    exactly as Pydantic writes them.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -1,38 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
-from sqlalchemy.orm import Session
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Query, Header, Response, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.db import get_db
-from app.auth import require_user
-from app.models.user import User
+from app.db import get_db, get_read_db
+from app.auth import require_principal, Principal
 from app.models.application import Application
-from app.schemas.application import ApplicationOut, ApplicationCreate
+from app.schemas.application import (
+    ApplicationOut,
+    ApplicationCreate,
+    BulkStatusUpdate,
+    BulkStatusUpdateOut,
+    CvLinksRequest,
+    CvLinksOut,
+    CvUploadRequest,
+    CvUploadOut,
+    CvUploadComplete,
+)
+from app.schemas.pagination import Page
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.services.application_service import (
     create_application,
     list_my_applications,
     list_applications_for_job,
+    export_applications_for_job,
     get_my_application_for_job,
     get_all_user_applications,
+    update_application_statuses,
+    get_cv_keys_for_user,
+    create_cv_upload,
+    complete_cv_upload,
 )
 from app.services.file_service import save_upload
-from app.s3 import presign_get_url
+from app.storage import get_storage
+from app.responses import FastJSONResponse
+from app.conditional import (
+    conditional_response,
+    load_versions,
+    applicant_applications_scope,
+    manager_applications_scope,
+    manager_jobs_scope,
+)
+from app.idempotency import IDEMPOTENCY_KEY_MAX_LENGTH, IdempotencyKeyReused, request_fingerprint, run_idempotent
 from app.services.email_service import send_application_confirmation
 
 router = APIRouter(prefix="/applications", tags=["Applications"])
 
 
+def _attach_cv_urls(applications):
+    urls = get_storage().download_urls(app["cv_s3_key"] for app in applications if app["cv_s3_key"])
+    for app in applications:
+        app["cv_download_url"] = urls.get(app["cv_s3_key"]) if app["cv_s3_key"] else None
+
+
 @router.post("/apply/{job_id}", response_model=ApplicationOut)
-def apply_to_job(
+async def apply_to_job(
     job_id: str,
+    response: Response,
     background_tasks: BackgroundTasks,
     full_name: str = Form(...),
     email: str = Form(...),
     phone: str | None = Form(None),
     cover_letter: str | None = Form(None),
     cv: UploadFile | None = File(None),
-    db: Session = Depends(get_db),
-    user: User = Depends(require_user),
+    idempotency_key: str | None = Header(None, max_length=IDEMPOTENCY_KEY_MAX_LENGTH),
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(require_principal),
 ):
+    """
+    Send an Idempotency-Key header to make retries safe: a repeat with the same key
+    returns the first response (marked Idempotent-Replayed: true) without applying again.
+    """
     if user.role != "applicant":
         raise HTTPException(status_code=403, detail="Only applicants can apply")
 
@@ -43,47 +82,103 @@ def apply_to_job(
         cover_letter=cover_letter,
     )
 
-    try:
-        app = create_application(db, job_id, user, payload, cv)
+    async def apply():
+        app = await create_application(db, job_id, user, payload, cv)
         background_tasks.add_task(
             send_application_confirmation,
             to_email=app.email,
             applicant_name=app.full_name,
-            job_title=app.job.title if hasattr(app, "job") and app.job else f"Job #{app.job_id}",
+            job_title=app.job_title,
         )
-        return app
+        return ApplicationOut.model_validate(app).model_dump(mode="json")
+
+    try:
+        if idempotency_key is None:
+            return await apply()
+        fingerprint = request_fingerprint(
+            job_id, payload.model_dump(), cv.filename if cv else None, cv.size if cv else None
+        )
+        body, replayed = await run_idempotent(("apply", str(user.id), idempotency_key), fingerprint, apply)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return body
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@router.post("/{application_id}/cv-upload", response_model=CvUploadOut)
+async def start_cv_upload(
+    application_id: str,
+    data: CvUploadRequest,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(require_principal),
+):
+    """
+    Presigned POST for uploading a CV straight to storage, instead of through /apply.
+    Apply without a CV, upload with the returned url and fields, then call .../cv-upload/complete.
+    """
+    if user.role != "applicant":
+        raise HTTPException(status_code=403, detail="Only applicants can upload a CV")
+    try:
+        return await create_cv_upload(db, application_id, user, data.filename, data.content_type)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
+
+@router.post("/{application_id}/cv-upload/complete", response_model=ApplicationOut)
+async def finish_cv_upload(
+    application_id: str,
+    data: CvUploadComplete,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(require_principal),
+):
+    """Verify the uploaded CV and attach it (with its type and size) to the application"""
+    if user.role != "applicant":
+        raise HTTPException(status_code=403, detail="Only applicants can upload a CV")
+    try:
+        return await complete_cv_upload(db, application_id, user, data.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
 
 @router.get("/{application_id}/cv-link")
-def get_cv_link(
+async def get_cv_link(
     application_id: str,
-    db: Session = Depends(get_db),
-    user: User = Depends(require_user),
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(require_principal),
 ):
-    app = db.scalar(select(Application).where(Application.id == application_id))
+    app = await db.scalar(select(Application).where(Application.id == application_id))
     if not app or not app.cv_s3_key:
         raise HTTPException(status_code=404, detail="CV not found")
 
     # TODO (later): authorize hiring manager owns the job OR applicant owns application
 
-    url = presign_get_url(app.cv_s3_key)
+    url = get_storage().download_url(app.cv_s3_key)
     return {"url": url}
 
-@router.get("/my", response_model=list[ApplicationOut])
-def my_applications(db: Session = Depends(get_db), user: User = Depends(require_user)):
+@router.get("/my", response_model=Page[ApplicationOut])
+async def my_applications(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(require_principal),
+):
     if user.role != "applicant":
         raise HTTPException(status_code=403, detail="Only applicants can view their applications")
-    return list_my_applications(db, user)
+    return FastJSONResponse(await list_my_applications(db, user, limit, cursor))
 
 
 @router.get("/my/{job_id}")
-def my_application_for_job(job_id: str, db: Session = Depends(get_db), user: User = Depends(require_user)):
+async def my_application_for_job(job_id: str, db: AsyncSession = Depends(get_read_db), user: Principal = Depends(require_principal)):
     """Get current applicant's application for a specific job with CV download link"""
     if user.role != "applicant":
         raise HTTPException(status_code=403, detail="Only applicants can view their applications")
     
-    app = get_my_application_for_job(db, job_id, user)
+    app = await get_my_application_for_job(db, job_id, user)
     
     # Convert to dict and add CV download URL if available
     result = {
@@ -100,46 +195,136 @@ def my_application_for_job(job_id: str, db: Session = Depends(get_db), user: Use
         "cv_filename": app.cv_filename,
         "cv_mime": app.cv_mime,
         "cv_size": app.cv_size,
-        "cv_download_url": presign_get_url(app.cv_s3_key) if app.cv_s3_key else None
+        "cv_download_url": get_storage().download_url(app.cv_s3_key) if app.cv_s3_key else None
     }
     return result
 
 
-@router.get("/job/{job_id}", response_model=list[ApplicationOut])
-def applications_for_job(job_id: str, db: Session = Depends(get_db), user: User = Depends(require_user)):
-    """Get all applications for a specific job including CV download links and cover letters"""
+@router.get("/job/{job_id}", response_model=Page[ApplicationOut])
+async def applications_for_job(
+    job_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    include_cv_urls: bool = True,
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(require_principal),
+):
+    """
+    Get all applications for a specific job including CV download links and cover letters.
+    With include_cv_urls=false, fetch links later for the rows shown via POST /applications/cv-links.
+    """
     if user.role != "hiring_manager":
         raise HTTPException(status_code=403, detail="Only hiring managers can view job applications")
 
     try:
-        applications = list_applications_for_job(db, job_id, user)
+        page = await list_applications_for_job(db, job_id, user, limit, cursor)
         
         # Add CV download URLs to each application
-        result = []
-        for app in applications:
-            app.cv_download_url = presign_get_url(app.cv_s3_key) if app.cv_s3_key else None
-            result.append(app)
+        if include_cv_urls:
+            _attach_cv_urls(page["items"])
         
-        return result
+        return FastJSONResponse(page)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except PermissionError as e:
         raise HTTPException(status_code=403, detail=str(e))
 
 
-@router.get("/all", response_model=list[ApplicationOut])
-def get_all_applications(db: Session = Depends(get_db), user: User = Depends(require_user)):
+@router.get("/job/{job_id}/export")
+async def export_job_applications(
+    job_id: str,
+    format: Literal["csv", "ndjson"] = "csv",
+    columns: str | None = Query(None, description="Comma-separated column names; all columns by default"),
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(require_principal),
+):
+    """
+    Download every application to a job as CSV or NDJSON, streamed as it is read.
+    Unlike /applications/job/{job_id} there is no paging and no CV links.
+    """
+    if user.role != "hiring_manager":
+        raise HTTPException(status_code=403, detail="Only hiring managers can export job applications")
+
+    try:
+        chunks = await export_applications_for_job(
+            db, job_id, user, [c.strip() for c in columns.split(",")] if columns else None, format
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
+    return StreamingResponse(
+        chunks,
+        media_type="text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="job-{int(job_id)}-applications.{format}"',
+            # Keep proxies from buffering the whole export before passing it on.
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.get("/all", response_model=Page[ApplicationOut])
+async def get_all_applications(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    include_cv_urls: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(require_principal),
+):
     """
     Get all applications for the current user:
     - Applicants: returns their submitted applications
     - Hiring Managers: returns all applications across all their posted jobs
+    By default the rows carry no CV links (fetch them for the rows shown via POST
+    /applications/cv-links) and the response supports conditional GET (ETag / 304),
+    which makes polling cheap. include_cv_urls=true signs links into every row; they
+    expire, so those responses never get a 304.
     """
-    applications = get_all_user_applications(db, user)
+    headers = None
+    if not include_cv_urls:
+        if user.role == "applicant":
+            scopes = [applicant_applications_scope(user.id)]
+        else:
+            # Job deletions (and the applications cascaded with them) show up in the job scope.
+            scopes = [manager_applications_scope(user.id), manager_jobs_scope(user.id)]
+        not_modified, headers = conditional_response(request, user.id, await load_versions(db, scopes))
+        if not_modified:
+            return not_modified
+
+    page = await get_all_user_applications(db, user, limit, cursor)
     
     # Add CV download URLs to each application
-    result = []
-    for app in applications:
-        app.cv_download_url = presign_get_url(app.cv_s3_key) if app.cv_s3_key else None
-        result.append(app)
+    if include_cv_urls:
+        _attach_cv_urls(page["items"])
     
-    return result
+    return FastJSONResponse(page, headers=headers)
+
+
+@router.post("/cv-links", response_model=CvLinksOut)
+async def get_cv_links(
+    data: CvLinksRequest,
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(require_principal),
+):
+    """Presigned CV URLs for just the applications the client is showing, signed as one batch"""
+    keys = await get_cv_keys_for_user(db, user, data.application_ids)
+    urls = get_storage().download_urls(key for key in keys.values() if key)
+    return {"urls": {app_id: urls[key] if key else None for app_id, key in keys.items()}}
+
+
+@router.patch("/status", response_model=BulkStatusUpdateOut)
+async def bulk_update_status(
+    data: BulkStatusUpdate,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(require_principal),
+):
+    """
+    Set the status of many applications at once, by `application_ids` or by `filter`
+    (job_id, current status, submitted_before / submitted_after). Returns a result per id.
+    """
+    if user.role != "hiring_manager":
+        raise HTTPException(status_code=403, detail="Only hiring managers can update application status")
+    return await update_application_statuses(db, user, data)
@@ -1,50 +1,152 @@
-from fastapi import APIRouter, Depends, status, HTTPException
-from sqlalchemy.orm import Session
-from app.db import get_db
-from app.models.user import User
-from app.schemas.job import JobCreate, Command
+from fastapi import APIRouter, Depends, status, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_db, get_read_db
+from app.schemas.job import JobCreate, Command, JobImportOut
 from app.schemas.application import ApplicationOut
-from app.services.job_service import create_job, get_jobs, get_jobs_for_manager, get_all_jobs, list_jobs_for_applicant
+from app.schemas.pagination import Page
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.services.job_service import create_job, get_jobs, stream_jobs, get_jobs_for_manager, get_all_jobs, list_jobs_for_applicant, search_jobs, get_job_dashboard
+from app.services.job_import_service import IMPORT_FORMATS, import_jobs
 from app.services.application_service import list_applications_for_job
-from app.auth import require_user
+from app.auth import require_principal, Principal
+from app.responses import FastJSONResponse
+from app.conditional import conditional_response, load_versions, jobs_scope, manager_jobs_scope, manager_applications_scope, applicant_applications_scope
+from app.catalogue_cache import catalogue_key, get_catalogue_page, cache_catalogue_page
 
 router = APIRouter(prefix="/job", tags=["Job"])
 
 @router.post("/post_job", status_code=status.HTTP_201_CREATED)
-async def create_job_endpoint(job_data: JobCreate, db: Session = Depends(get_db), user: User = Depends(require_user)):
+async def create_job_endpoint(job_data: JobCreate, db: AsyncSession = Depends(get_db), user: Principal = Depends(require_principal)):
     if user.role != "hiring_manager":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only hiring managers can create jobs")
     return await create_job(db, job_data, user.id)
+
+@router.post("/import", response_model=JobImportOut)
+async def import_jobs_endpoint(request: Request, db: AsyncSession = Depends(get_db), user: Principal = Depends(require_principal)):
+    """
+    Post many jobs at once from a CSV (text/csv, with a title,description,location[,salary]
+    header) or NDJSON (application/x-ndjson, one JobCreate object per line) request body.
+    Valid rows are imported in one transaction; rejected rows are reported by line.
+    """
+    if user.role != "hiring_manager":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only hiring managers can import jobs")
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = IMPORT_FORMATS.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Send the jobs as one of: {', '.join(IMPORT_FORMATS)}",
+        )
+    return await import_jobs(db, request.stream(), fmt, user.id)
 @router.get("/all")
-async def list_all_jobs_for_manager(db: Session = Depends(get_db), user: User = Depends(require_user)):
+async def list_all_jobs_for_manager(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(require_principal),
+):
+    """Supports conditional GET: send back the ETag as If-None-Match to get 304 when unchanged"""
+    if user.role == "applicant":
+        # has_applied depends on the applicant's own applications too.
+        scopes = [jobs_scope(), applicant_applications_scope(user.id)]
+    else:
+        scopes = [manager_jobs_scope(user.id)]
+    not_modified, headers = conditional_response(request, user.id, await load_versions(db, scopes))
+    if not_modified:
+        return not_modified
+
     if user.role == "applicant":
-        job =  await list_jobs_for_applicant(db, user.id)
+        job =  await list_jobs_for_applicant(db, user.id, limit, cursor)
 
-        return job  
-    return await get_jobs_for_manager(db,user.id)
+        return FastJSONResponse(job, headers=headers)
+    return FastJSONResponse(await get_jobs_for_manager(db, user.id, limit, cursor), headers=headers)
+
+@router.get("/dashboard")
+async def job_dashboard(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(require_principal),
+):
+    """Application counts by status for each of the manager's jobs, and in total. Supports conditional GET."""
+    if user.role != "hiring_manager":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only hiring managers can view the dashboard")
+    scopes = [manager_jobs_scope(user.id), manager_applications_scope(user.id)]
+    not_modified, headers = conditional_response(request, user.id, await load_versions(db, scopes))
+    if not_modified:
+        return not_modified
+    return FastJSONResponse(await get_job_dashboard(db, user.id, limit, cursor), headers=headers)
 
 @router.get("/browse")
-async def browse_all_jobs(db: Session = Depends(get_db), user: User = Depends(require_user)):
-    """Get all available jobs for browsing (for applicants and hiring managers)"""
-    jobs = await get_all_jobs(db)
-    return jobs
+async def browse_all_jobs(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(require_principal),
+):
+    """Get all available jobs for browsing (for applicants and hiring managers). Supports conditional GET."""
+    versions = await load_versions(db, [jobs_scope()])
+    not_modified, headers = conditional_response(request, user.id, versions)
+    if not_modified:
+        return not_modified
+
+    # Same pages for every user: served from the shared cache until jobs change.
+    key = catalogue_key(versions[jobs_scope()][0], limit, cursor)
+    body = await get_catalogue_page(key)
+    if body is None:
+        body = FastJSONResponse(await get_all_jobs(db, limit, cursor)).body
+        await cache_catalogue_page(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/search")
+async def search_all_jobs(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(require_principal),
+):
+    """Full-text search over job title, description and location, best matches first"""
+    return FastJSONResponse(await search_jobs(db, q, limit, cursor))
 
 @router.post("/my_jobs")
-async def get_my_jobs(command: Command, user: User = Depends(require_user)):
-    print(command)
+async def get_my_jobs(command: Command, db: AsyncSession = Depends(get_db), user: Principal = Depends(require_principal)):
     if user.role != "hiring_manager":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only hiring managers can view their jobs")
-    jobs = await get_jobs(command.command, user.id)
+    jobs = await get_jobs(db, command.command, user.id)
     return jobs
 
 
-@router.get("/{job_id}/applicants", response_model=list[ApplicationOut])
-def get_job_applicants(job_id: str, db: Session = Depends(get_db), user: User = Depends(require_user)):
+@router.post("/my_jobs/stream")
+async def stream_my_jobs(command: Command, db: AsyncSession = Depends(get_db), user: Principal = Depends(require_principal)):
+    """Same as /my_jobs, but streams tokens and tool-call progress as Server-Sent Events"""
+    if user.role != "hiring_manager":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only hiring managers can view their jobs")
+    return StreamingResponse(
+        stream_jobs(db, command.command, user.id),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream into a single late response.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{job_id}/applicants", response_model=Page[ApplicationOut])
+async def get_job_applicants(
+    job_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(require_principal),
+):
     if user.role != "hiring_manager":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only hiring managers can view job applicants")
     
     try:
-        return list_applications_for_job(db, job_id, user)
+        return FastJSONResponse(await list_applications_for_job(db, job_id, user, limit, cursor))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except PermissionError as e:
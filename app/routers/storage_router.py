@@ -0,0 +1,41 @@
+import os
+from urllib.parse import quote
+
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import FileResponse
+from dotenv import load_dotenv
+
+from app.storage import LocalStorage, get_storage, verify_download
+
+load_dotenv()
+# When set (e.g. /protected-cvs), answer with X-Accel-Redirect to this internal
+# nginx location instead of the file, so nginx serves it with sendfile.
+STORAGE_LOCAL_ACCEL_REDIRECT = os.getenv("STORAGE_LOCAL_ACCEL_REDIRECT", "").rstrip("/")
+
+router = APIRouter(prefix="/storage", tags=["Storage"])
+
+
+@router.api_route("/{key:path}", methods=["GET", "HEAD"], include_in_schema=False)
+def download(key: str, expires: int, signature: str):
+    """
+    Serve a locally stored CV from a signed link made by LocalStorage.download_urls.
+    FileResponse handles HEAD and Range requests, and hands whole-file sends to
+    servers that support http.response.pathsend.
+    """
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Not found")
+    if not verify_download(key, expires, signature):
+        raise HTTPException(status_code=403, detail="Link is invalid or has expired")
+    try:
+        path = storage.path_for(key)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Not found")
+
+    headers = {"Cache-Control": "private, no-store"}
+    if STORAGE_LOCAL_ACCEL_REDIRECT:
+        headers["X-Accel-Redirect"] = f"{STORAGE_LOCAL_ACCEL_REDIRECT}/{quote(key)}"
+        return Response(headers=headers)
+    return FileResponse(path, filename=path.name, content_disposition_type="inline", headers=headers)
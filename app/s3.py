@@ -1,41 +1,98 @@
 # app/s3.py
 import os
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.auth import S3SigV4QueryAuth
+from botocore.awsrequest import AWSRequest
 from botocore.client import Config
-from urllib.parse import quote
+from botocore.exceptions import ClientError
+from urllib.parse import quote, urlsplit
+
+from app.cache import TTLCache
+from app.storage import CV_MAX_BYTES
+from app.observability import span
 
 AWS_REGION = os.getenv("AWS_REGION", "eu-north-1")
 S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
-S3_PREFIX = os.getenv("S3_PREFIX", "applications")
 S3_PRESIGN_EXPIRES_SECONDS = int(os.getenv("S3_PRESIGN_EXPIRES_SECONDS", "60"))
-sts = boto3.client("sts")
+# A cached URL is handed out again only while it has at least this long left to live.
+S3_PRESIGN_MIN_REMAINING_SECONDS = int(os.getenv("S3_PRESIGN_MIN_REMAINING_SECONDS", "15"))
+S3_URL_CACHE_SIZE = int(os.getenv("S3_URL_CACHE_SIZE", "50000"))
+# Point at an S3-compatible stand-in (MinIO, moto_server) for local runs and tests.
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+S3_UPLOAD_EXPIRES_SECONDS = int(os.getenv("S3_UPLOAD_EXPIRES_SECONDS", "600"))
+# Multipart part size and parts in flight; together they bound memory per upload.
+S3_MULTIPART_CHUNK_BYTES = int(os.getenv("S3_MULTIPART_CHUNK_BYTES", str(8 * 1024 * 1024)))
+S3_UPLOAD_CONCURRENCY = int(os.getenv("S3_UPLOAD_CONCURRENCY", "2"))
 
 if not S3_BUCKET_NAME:
     raise RuntimeError("S3_BUCKET_NAME is not set")
 
-_s3 = boto3.client(
+_session = boto3.session.Session()
+_s3 = _session.client(
     "s3",
     region_name=AWS_REGION,
+    endpoint_url=S3_ENDPOINT_URL,
     config=Config(signature_version="s3v4"),
 )
 
-def build_cv_key(application_id: str, filename: str) -> str:
-    safe_name = filename.replace("/", "_").replace("\\", "_")
-    return f"{S3_PREFIX}/{application_id}/cv/{safe_name}"
+_url_cache = TTLCache(
+    "cv_url",
+    S3_URL_CACHE_SIZE,
+    max(0, S3_PRESIGN_EXPIRES_SECONDS - S3_PRESIGN_MIN_REMAINING_SECONDS),
+)
+_object_url_prefix: str | None = None
+
+_transfer_config = TransferConfig(
+    multipart_threshold=S3_MULTIPART_CHUNK_BYTES,
+    multipart_chunksize=S3_MULTIPART_CHUNK_BYTES,
+    max_concurrency=S3_UPLOAD_CONCURRENCY,
+)
+# Parts read ahead of the uploads sit in memory; the default allows 10 of them.
+# Not a constructor argument, hence set afterwards.
+_transfer_config.max_in_memory_upload_chunks = S3_UPLOAD_CONCURRENCY
 
-def upload_cv_file(fileobj, key: str, content_type: str | None = None):
+def upload_stream(reader, key: str, content_type: str | None = None):
+    """Upload from a read()-only stream, read once, front to back, one part at a time."""
     extra = {}
     if content_type:
         extra["ContentType"] = content_type
 
     _s3.upload_fileobj(
-        Fileobj=fileobj.file,
+        Fileobj=reader,
         Bucket=S3_BUCKET_NAME,
         Key=key,
         ExtraArgs=extra,
+        Config=_transfer_config,
     )
 
-def presign_get_url(key: str, download_name: str | None = None) -> str:
+def presign_cv_upload(key: str, content_type: str) -> dict:
+    """
+    Presigned POST that lets the client upload one CV straight to the bucket:
+    exactly `key`, with this content type, at most CV_MAX_BYTES.
+    """
+    with span("s3_presign"):
+        return _s3.generate_presigned_post(
+            Bucket=S3_BUCKET_NAME,
+            Key=key,
+            Fields={"Content-Type": content_type},
+            Conditions=[{"Content-Type": content_type}, ["content-length-range", 1, CV_MAX_BYTES]],
+            ExpiresIn=S3_UPLOAD_EXPIRES_SECONDS,
+        )
+
+def head_cv_object(key: str) -> dict | None:
+    """Object metadata (ContentLength, ContentType, ...), or None if nothing is stored at `key`."""
+    try:
+        return _s3.head_object(Bucket=S3_BUCKET_NAME, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+def delete_cv_object(key: str) -> None:
+    _s3.delete_object(Bucket=S3_BUCKET_NAME, Key=key)
+
+def _sign_get_url(key: str, download_name: str | None = None) -> str:
     params = {"Bucket": S3_BUCKET_NAME, "Key": key}
 
     # Optional: force a download filename (nicer UX)
@@ -44,8 +101,60 @@ def presign_get_url(key: str, download_name: str | None = None) -> str:
         params["ResponseContentDisposition"] = f'attachment; filename="{safe}"'
         # Optional: if you want, you can also set ResponseContentType
 
-    return _s3.generate_presigned_url(
-        ClientMethod="get_object",
-        Params=params,
-        ExpiresIn=S3_PRESIGN_EXPIRES_SECONDS,
-    )
+    with span("s3_presign"):
+        return _s3.generate_presigned_url(
+            ClientMethod="get_object",
+            Params=params,
+            ExpiresIn=S3_PRESIGN_EXPIRES_SECONDS,
+        )
+
+def _url_prefix() -> str:
+    """Object URL up to the key (endpoint, plus the bucket for path-style addressing)."""
+    global _object_url_prefix
+    if _object_url_prefix is None:
+        probe = urlsplit(_sign_get_url("probe"))
+        _object_url_prefix = f"{probe.scheme}://{probe.netloc}{probe.path[:-len('probe')]}"
+    return _object_url_prefix
+
+def presign_get_urls(keys) -> dict[str, str]:
+    """
+    Presigned GET URLs for many keys at once, reusing cached URLs that are not close to expiry.
+
+    Fresh URLs are signed with one SigV4 query signer for the whole batch, which skips
+    boto3's per-call request pipeline and yields the same URLs as `generate_presigned_url`.
+    """
+    urls = {}
+    missing = []
+    for key in dict.fromkeys(keys):
+        url = _url_cache.get((key, None))
+        if url is None:
+            missing.append(key)
+        else:
+            urls[key] = url
+    if not missing:
+        return urls
+
+    prefix = _url_prefix()
+    with span("s3_presign"):
+        signer = S3SigV4QueryAuth(
+            _session.get_credentials().get_frozen_credentials(),
+            "s3",
+            _s3.meta.region_name,
+            expires=S3_PRESIGN_EXPIRES_SECONDS,
+        )
+        for key in missing:
+            request = AWSRequest(method="GET", url=prefix + quote(key, safe="/~"))
+            signer.add_auth(request)
+            urls[key] = request.url
+            _url_cache.set((key, None), request.url)
+    return urls
+
+def presign_get_url(key: str, download_name: str | None = None) -> str:
+    if download_name is None:
+        return presign_get_urls([key])[key]
+
+    url = _url_cache.get((key, download_name))
+    if url is None:
+        url = _sign_get_url(key, download_name)
+        _url_cache.set((key, download_name), url)
+    return url
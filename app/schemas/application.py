@@ -1,9 +1,15 @@
-from pydantic import BaseModel, EmailStr, Field,ConfigDict
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field,ConfigDict, model_validator
+from typing import Optional, Literal
 from uuid import UUID
 from datetime import datetime
 
 
+ApplicationStatus = Literal["submitted", "reviewed", "shortlisted", "rejected", "accepted"]
+
+# Upper bound on explicit ids per bulk status update.
+MAX_BULK_STATUS_IDS = 1000
+
+
 class ApplicationCreate(BaseModel):
     full_name: str = Field(min_length=2, max_length=120)
     phone: Optional[str] = Field(default=None, max_length=40)
@@ -28,3 +34,68 @@ class ApplicationOut(BaseModel):
     cv_size: Optional[int] = None
     job_title: Optional[str] = None
     cv_download_url: Optional[str] = None
+    cv_sha256: Optional[str] = None
+
+
+class ApplicationStatusFilter(BaseModel):
+    job_id: Optional[int] = None
+    status: Optional[ApplicationStatus] = None
+    submitted_before: Optional[datetime] = None
+    submitted_after: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def _not_empty(self):
+        if all(v is None for v in (self.job_id, self.status, self.submitted_before, self.submitted_after)):
+            raise ValueError("filter needs at least one criterion")
+        return self
+
+
+class BulkStatusUpdate(BaseModel):
+    """New status for the given application ids, or for every application matching `filter`."""
+    status: ApplicationStatus
+    application_ids: Optional[list[UUID]] = Field(default=None, min_length=1, max_length=MAX_BULK_STATUS_IDS)
+    filter: Optional[ApplicationStatusFilter] = None
+
+    @model_validator(mode="after")
+    def _ids_or_filter(self):
+        if (self.application_ids is None) == (self.filter is None):
+            raise ValueError("provide exactly one of application_ids or filter")
+        return self
+
+
+class StatusUpdateResult(BaseModel):
+    id: UUID
+    result: Literal["updated", "not_found"]
+    status: Optional[str] = None
+
+
+class BulkStatusUpdateOut(BaseModel):
+    updated: int
+    results: list[StatusUpdateResult]
+
+
+class CvLinksRequest(BaseModel):
+    application_ids: list[UUID] = Field(min_length=1, max_length=100)
+
+
+class CvLinksOut(BaseModel):
+    """Presigned CV URL per visible application id; None when it has no CV."""
+    urls: dict[UUID, Optional[str]]
+
+
+class CvUploadRequest(BaseModel):
+    filename: str = Field(min_length=1, max_length=255)
+    content_type: str = Field(min_length=1, max_length=255)
+
+
+class CvUploadOut(BaseModel):
+    """Presigned POST: send `fields` plus the file as multipart form data to `url`."""
+    url: str
+    fields: dict[str, str]
+    key: str
+    expires_in: int
+    max_bytes: int
+
+
+class CvUploadComplete(BaseModel):
+    filename: str = Field(min_length=1, max_length=255)
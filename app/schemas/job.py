@@ -5,4 +5,17 @@ class JobCreate(BaseModel):
     location: str
     salary: str | None = None
 class Command(BaseModel):
-    command: str
\ No newline at end of file
+    command: str
+
+class JobImportRowError(BaseModel):
+    line: int
+    errors: list[dict]
+
+
+class JobImportOut(BaseModel):
+    received: int
+    imported: int
+    duplicates: int
+    rejected: int
+    errors: list[JobImportRowError]
+    errors_truncated: bool
@@ -1,27 +1,74 @@
 from passlib.context import CryptContext
+import asyncio
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Union, Any
+from fastapi import HTTPException, status
 from jose import jwt
 from dotenv import load_dotenv
+
+from app.metrics import (
+    PASSWORD_HASH_SECONDS,
+    PASSWORD_HASH_QUEUE_WAIT_SECONDS,
+    PASSWORD_HASH_PENDING,
+    PASSWORD_HASH_REJECTED_TOTAL,
+)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 load_dotenv()
 JWT_SECRET = os.getenv("JWT_SECRET")
 JWT_ALG = os.getenv("JWT_ALG", "HS256")
 JWT_EXPIRES_MIN = int(os.getenv("JWT_EXPIRES_MIN", "60"))
+# bcrypt releases the GIL, so a small thread pool hashes in parallel without
+# blocking the event loop. Jobs beyond the pending limit are refused with 503.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
 
 if not JWT_SECRET:
     raise RuntimeError("JWT_SECRET is not set in .env")
 
-def create_access_token(user_id: str, role: str) -> str:
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_pending = 0
+
+def create_access_token(user_id: str, role: str, version: int = 0) -> str:
+    """`version` is the user's "users:<id>" data version; the role claim holds only while it is current."""
     exp = datetime.utcnow() + timedelta(minutes=JWT_EXPIRES_MIN)
-    payload = {"sub": user_id, "role": role, "exp": exp}
+    payload = {"sub": user_id, "role": role, "ver": version, "exp": exp}
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALG)
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def _run_in_hash_pool(operation: str, fn, *args):
+    global _pending
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        PASSWORD_HASH_REJECTED_TOTAL.inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in requests, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    queued_at = time.perf_counter()
+
+    def timed():
+        started = time.perf_counter()
+        PASSWORD_HASH_QUEUE_WAIT_SECONDS.observe(started - queued_at)
+        try:
+            return fn(*args)
+        finally:
+            PASSWORD_HASH_SECONDS.labels(operation).observe(time.perf_counter() - started)
+
+    _pending += 1
+    PASSWORD_HASH_PENDING.inc()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, timed)
+    finally:
+        _pending -= 1
+        PASSWORD_HASH_PENDING.dec()
+
+async def hash_password(password: str) -> str:
+    return await _run_in_hash_pool("hash", pwd_context.hash, password)
 
 
-def verify_password(password: str, password_hash: str) -> bool:
-    return pwd_context.verify(password, password_hash)
+async def verify_password(password: str, password_hash: str) -> bool:
+    return await _run_in_hash_pool("verify", pwd_context.verify, password, password_hash)
@@ -1,74 +1,220 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+import os
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, true, update, literal, null
+from sqlalchemy.dialects.postgresql import insert
 from app.models.application import Application
 from app.models.job import Job
-from app.schemas.application import ApplicationCreate
+from app.schemas.application import ApplicationCreate, BulkStatusUpdate
 from fastapi import HTTPException, UploadFile
-from uuid import UUID
-from app.s3 import build_cv_key, upload_cv_file, presign_get_url
+from fastapi.concurrency import run_in_threadpool
+from uuid import UUID, uuid4
+from datetime import datetime, timezone
+from app.storage import build_cv_key, get_storage, CV_MAX_BYTES
+from app.pagination import keyset, build_page
 
-def create_application(
-    db: Session,
+# Rows fetched per round trip from the server-side cursor behind an export.
+APPLICATION_EXPORT_BATCH_ROWS = int(os.getenv("APPLICATION_EXPORT_BATCH_ROWS", "1000"))
+
+
+def _application_key(app):
+    return app.submitted_at, app.id
+
+
+# The columns behind ApplicationOut. List endpoints select just these as rows and
+# return them as dicts, skipping ORM hydration and response-model validation.
+_APPLICATION_OUT_COLUMNS = (
+    Application.id,
+    Application.job_id,
+    Application.applicant_id,
+    Application.full_name,
+    Application.phone,
+    Application.email,
+    Application.cover_letter,
+    Application.status,
+    Application.submitted_at,
+    Application.cv_s3_key,
+    Application.cv_filename,
+    Application.cv_mime,
+    Application.cv_size,
+)
+
+
+def _application_page(rows, limit: int) -> dict:
+    """build_page over ApplicationOut rows (with a job_title column), items as dicts."""
+    page = build_page(rows, limit, _application_key)
+    page["items"] = [{**r._mapping, "cv_download_url": None, "cv_sha256": None} for r in page["items"]]
+    return page
+
+_APPLY_COLUMNS = [
+    "id", "job_id", "applicant_id", "full_name", "email", "phone", "cover_letter",
+    "status", "submitted_at", "cv_s3_key", "cv_filename", "cv_mime", "cv_size",
+]
+
+
+async def create_application(
+    db: AsyncSession,
     job_id: str,
     applicant_user,
     data: ApplicationCreate,
     cv: UploadFile | None,
 ):
-    job = db.scalar(select(Job).where(Job.id == int(job_id)))
-    if not job:
+    """
+    Apply in one round trip: the CV is stored first under a pre-assigned application id,
+    then a single INSERT ... SELECT FROM jobs ... ON CONFLICT DO NOTHING records the
+    application and returns it with the job's title. No row means the job does not exist;
+    a row without an application means the applicant already applied (409). Either way
+    the stored CV is removed again. With a CV, the job is checked before it is stored, so
+    a request for a missing job never uploads one.
+    """
+    try:
+        job_pk = int(job_id)
+    except ValueError:
+        raise ValueError("Job not found")
+    if cv and await db.scalar(select(Job.id).where(Job.id == job_pk)) is None:
         raise ValueError("Job not found")
 
-    app = Application(
-        job_id=job.id,
-        applicant_id=applicant_user.id,
-        full_name=data.full_name,
-        phone=data.phone,
-        email=str(data.email),
-        cover_letter=data.cover_letter,
-        status="submitted",
-    )
-    db.add(app)
-    db.commit()
-    db.refresh(app)
+    app_id = uuid4()
+    values = {
+        "full_name": data.full_name,
+        "email": str(data.email),
+        "phone": data.phone,
+        "cover_letter": data.cover_letter,
+        "status": "submitted",
+        "submitted_at": datetime.utcnow(),
+        "cv_s3_key": None,
+        "cv_filename": None,
+        "cv_mime": None,
+        "cv_size": None,
+    }
 
-    # upload CV + update row
+    stored = None
     if cv:
-        key = build_cv_key(str(app.id), cv.filename or "cv")
-        upload_cv_file(cv, key)
+        key = build_cv_key(str(app_id), cv.filename or "cv")
+        # Storage I/O is blocking; keep the upload off the event loop.
+        stored = await run_in_threadpool(get_storage().save, key, cv.file, cv.content_type)
+        values.update(cv_s3_key=key, cv_filename=cv.filename, cv_mime=cv.content_type, cv_size=stored.size)
 
-        app.cv_s3_key = key
-        app.cv_filename = cv.filename
-        app.cv_mime = cv.content_type
-        db.commit()
-        db.refresh(app)
+    job = select(Job.id, Job.title).where(Job.id == job_pk).cte("job")
+    source = select(
+        literal(app_id, Application.id.type),
+        job.c.id,
+        literal(applicant_user.id, Application.applicant_id.type),
+        *(literal(values[name], Application.__table__.c[name].type) for name in _APPLY_COLUMNS[3:]),
+    )
+    inserted = (
+        insert(Application)
+        .from_select(_APPLY_COLUMNS, source)
+        .on_conflict_do_nothing(constraint="uq_applicant_job")
+        .returning(*(Application.__table__.c[name] for name in _APPLY_COLUMNS))
+        .cte("inserted")
+    )
+    stmt = select(
+        job.c.title.label("job_title"),
+        *inserted.c,
+    ).select_from(job.outerjoin(inserted, true()))
 
+    try:
+        row = (await db.execute(stmt)).first()
+        await db.commit()
+    except Exception:
+        if stored:
+            await run_in_threadpool(get_storage().delete, stored.key)
+        raise
+
+    if row is None or row.id is None:
+        if stored:
+            await run_in_threadpool(get_storage().delete, stored.key)
+        if row is None:
+            raise ValueError("Job not found")
+        raise HTTPException(status_code=409, detail="You have already applied to this job")
+
+    app = Application(**{name: getattr(row, name) for name in _APPLY_COLUMNS})
+    app.job_title = row.job_title
+    # Lets the client check the CV arrived intact; not persisted.
+    app.cv_sha256 = stored.sha256 if stored else None
     return app
 
-def get_application_by_id(db: Session, application_id: str) -> Application:
+async def _get_own_application(db: AsyncSession, application_id: str, applicant_user):
+    row = (
+        await db.execute(
+            select(Application, Job).join(Job, Application.job_id == Job.id).where(Application.id == UUID(application_id))
+        )
+    ).first()
+    if not row:
+        raise ValueError("Application not found")
+    app, job = row
+    if app.applicant_id != applicant_user.id:
+        raise PermissionError("Not allowed")
+    return app, job
+
+
+async def create_cv_upload(db: AsyncSession, application_id: str, applicant_user, filename: str, content_type: str):
+    """
+    Presigned POST for uploading the applicant's CV straight to the bucket, scoped to the
+    application's CV key. Follow up with complete_cv_upload once the upload has finished.
+    """
+    storage = get_storage()
+    if not storage.supports_direct_upload:
+        raise HTTPException(status_code=501, detail="Direct CV uploads need the S3 storage backend; send the CV with the application instead")
+    app, _ = await _get_own_application(db, application_id, applicant_user)
+    key = build_cv_key(str(app.id), filename)
+    post = storage.presign_upload(key, content_type)
+    return {
+        "url": post["url"],
+        "fields": post["fields"],
+        "key": key,
+        "expires_in": storage.upload_expires_seconds,
+        "max_bytes": CV_MAX_BYTES,
+    }
+
+
+async def complete_cv_upload(db: AsyncSession, application_id: str, applicant_user, filename: str):
+    """Check the directly uploaded CV with HEAD and record it on the application."""
+    app, job = await _get_own_application(db, application_id, applicant_user)
+    key = build_cv_key(str(app.id), filename)
+    head = await run_in_threadpool(get_storage().head, key)
+    if head is None:
+        raise HTTPException(status_code=409, detail="CV upload not found; upload the file before completing")
+    if head["size"] > CV_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="CV is too large")
+
+    app.cv_s3_key = key
+    app.cv_filename = filename
+    app.cv_mime = head["content_type"]
+    app.cv_size = head["size"]
+    await db.commit()
+    await db.refresh(app)
+
+    app.job_title = job.title
+    return app
+
+
+async def get_application_by_id(db: AsyncSession, application_id: str) -> Application:
     try:
         app_id = UUID(application_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid application_id")
 
-    app = db.scalar(select(Application).where(Application.id == app_id))
+    app = await db.scalar(select(Application).where(Application.id == app_id))
     if not app:
         raise HTTPException(status_code=404, detail="Application not found")
     return app
 
 
-def get_application_cv_link(
-    db: Session,
+async def get_application_cv_link(
+    db: AsyncSession,
     application_id: str,
     user,
 ) -> str:
     """
-    Returns a short-lived presigned URL for the application's CV.
+    Returns a short-lived signed URL for the application's CV.
 
     Authorization policy (simple):
     - applicant can access their own application CV
     - hiring manager can access CV if they own the job that application belongs to
     """
-    app = get_application_by_id(db, application_id)
+    app = await get_application_by_id(db, application_id)
 
     if not app.cv_s3_key:
         raise HTTPException(status_code=404, detail="CV not found")
@@ -77,25 +223,27 @@ def get_application_cv_link(
     if getattr(user, "role", None) == "applicant":
         if str(app.applicant_id) != str(user.id):
             raise HTTPException(status_code=403, detail="Not allowed")
-        return presign_get_url(app.cv_s3_key)
+        return get_storage().download_url(app.cv_s3_key)
 
     # Hiring manager can access if they own the job
     if getattr(user, "role", None) == "hiring_manager":
-        job = db.scalar(select(Job).where(Job.id == app.job_id))
+        job = await db.scalar(select(Job).where(Job.id == app.job_id))
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
 
         if str(job.hiring_manager_id) != str(user.id):
             raise HTTPException(status_code=403, detail="Not allowed")
-        return presign_get_url(app.cv_s3_key)
+        return get_storage().download_url(app.cv_s3_key)
 
     raise HTTPException(status_code=403, detail="Not allowed")
 
-def list_my_applications(db: Session, applicant_user):
-    return db.scalars(select(Application).where(Application.applicant_id == applicant_user.id).order_by(Application.submitted_at.desc())).all()
+async def list_my_applications(db: AsyncSession, applicant_user, limit: int, cursor: str | None = None):
+    stmt = select(*_APPLICATION_OUT_COLUMNS, null().label("job_title")).where(Application.applicant_id == applicant_user.id)
+    stmt = keyset(stmt, Application.submitted_at, Application.id, cursor, limit)
+    return _application_page((await db.execute(stmt)).all(), limit)
 
 
-def get_my_application_for_job(db: Session, job_id: str, applicant_user):
+async def get_my_application_for_job(db: AsyncSession, job_id: str, applicant_user):
     """Get the current applicant's application for a specific job"""
     try:
         job_id_int = int(job_id)
@@ -103,12 +251,12 @@ def get_my_application_for_job(db: Session, job_id: str, applicant_user):
         raise HTTPException(status_code=400, detail="Invalid job_id")
     
     # Check if job exists
-    job = db.scalar(select(Job).where(Job.id == job_id_int))
+    job = await db.scalar(select(Job).where(Job.id == job_id_int))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
     # Get the applicant's application for this job
-    app = db.scalar(
+    app = await db.scalar(
         select(Application).where(
             (Application.job_id == job_id_int) & 
             (Application.applicant_id == applicant_user.id)
@@ -120,54 +268,180 @@ def get_my_application_for_job(db: Session, job_id: str, applicant_user):
     
     return app
 
-def list_applications_for_job(db: Session, job_id: str, hiring_manager_user):
-    job = db.scalar(select(Job).where(Job.id == int(job_id)))
+async def _get_manager_job(db: AsyncSession, job_id: str, hiring_manager_user) -> Job:
+    job = await db.scalar(select(Job).where(Job.id == int(job_id)))
     if not job:
         raise ValueError("Job not found")
 
     # permission check: only the job's hiring manager can view
     if str(job.hiring_manager_id) != str(hiring_manager_user.id):
         raise PermissionError("Not allowed")
+    return job
+
 
-    return db.scalars(select(Application).where(Application.job_id == job.id).order_by(Application.submitted_at.desc())).all()
+async def list_applications_for_job(db: AsyncSession, job_id: str, hiring_manager_user, limit: int, cursor: str | None = None):
+    job = await _get_manager_job(db, job_id, hiring_manager_user)
+    stmt = select(*_APPLICATION_OUT_COLUMNS, null().label("job_title")).where(Application.job_id == job.id)
+    stmt = keyset(stmt, Application.submitted_at, Application.id, cursor, limit)
+    return _application_page((await db.execute(stmt)).all(), limit)
 
 
-def get_all_user_applications(db: Session, user):
+# Columns an export can include, in their default order.
+EXPORT_COLUMNS = {column.key: column for column in _APPLICATION_OUT_COLUMNS}
+# Spreadsheets run cells starting with these as formulas; exported CSV cells are
+# prefixed with a quote so applicant-supplied text stays text.
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    value = str(value)
+    if value.startswith(_FORMULA_PREFIXES):
+        value = "'" + value
+    # Quote as csv.writer's QUOTE_MINIMAL does; str methods are several times
+    # faster than the csv module on long, multi-line cover letters.
+    if '"' in value or "," in value or "\n" in value or "\r" in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def _csv_line(values) -> str:
+    return ",".join(map(_csv_cell, values)) + "\r\n"
+
+
+async def _export_chunks(db: AsyncSession, stmt, columns: list[str], fmt: str):
+    if fmt == "csv":
+        # The header goes out before the query runs, so the download starts at once.
+        yield _csv_line(columns).encode()
+    result = await db.stream(stmt.execution_options(yield_per=APPLICATION_EXPORT_BATCH_ROWS))
+    async for rows in result.partitions():
+        if fmt == "csv":
+            yield "".join(map(_csv_line, rows)).encode()
+        else:
+            yield b"".join(orjson.dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+async def export_applications_for_job(db: AsyncSession, job_id: str, hiring_manager_user, columns: list[str] | None, fmt: str):
+    """
+    All applications to a job as CSV or NDJSON byte chunks, newest first, for a
+    StreamingResponse. Rows come off a server-side cursor APPLICATION_EXPORT_BATCH_ROWS
+    at a time, so memory stays flat however many there are. The job and column
+    checks run before streaming starts, so they still fail with a status code.
+    """
+    job = await _get_manager_job(db, job_id, hiring_manager_user)
+    columns = columns or list(EXPORT_COLUMNS)
+    unknown = [name for name in columns if name not in EXPORT_COLUMNS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown columns: {', '.join(unknown)}; choose from {', '.join(EXPORT_COLUMNS)}",
+        )
+    stmt = (
+        select(*(EXPORT_COLUMNS[name] for name in columns))
+        .where(Application.job_id == job.id)
+        .order_by(Application.submitted_at.desc(), Application.id.desc())
+    )
+    return _export_chunks(db, stmt, columns, fmt)
+
+
+async def get_cv_keys_for_user(db: AsyncSession, user, application_ids) -> dict:
+    """
+    cv_s3_key of each requested application the caller may see: their own
+    applications, or applications to their jobs. Others are left out.
+    """
+    stmt = (
+        select(Application.id, Application.cv_s3_key)
+        .join(Job, Application.job_id == Job.id)
+        .where(Application.id.in_(application_ids))
+    )
+    if user.role == "applicant":
+        stmt = stmt.where(Application.applicant_id == user.id)
+    else:
+        stmt = stmt.where(Job.hiring_manager_id == user.id)
+    return {row.id: row.cv_s3_key for row in (await db.execute(stmt)).all()}
+
+
+async def get_all_user_applications(db: AsyncSession, user, limit: int, cursor: str | None = None):
     """
     Get all applications for the current user:
     - If applicant: returns their submitted applications
     - If hiring manager: returns all applications across all their posted jobs
     """
     if user.role == "applicant":
-        # Get applications with job titles
-        applications = db.execute(
-            select(Application, Job.title)
+        stmt = (
+            select(*_APPLICATION_OUT_COLUMNS, Job.title.label("job_title"))
             .join(Job, Application.job_id == Job.id)
             .where(Application.applicant_id == user.id)
-            .order_by(Application.submitted_at.desc())
-        ).all()
-        
-        # Add job_title to each application
-        result = []
-        for app, job_title in applications:
-            app.job_title = job_title
-            result.append(app)
-        return result
-    
+        )
+        rows = (await db.execute(keyset(stmt, Application.submitted_at, Application.id, cursor, limit))).all()
+        return _application_page(rows, limit)
+
     elif user.role == "hiring_manager":
-        # Get all applications for jobs posted by this hiring manager with job titles
-        applications = db.execute(
-            select(Application, Job.title)
-            .join(Job, Application.job_id == Job.id)
-            .where(Job.hiring_manager_id == user.id)
-            .order_by(Application.submitted_at.desc())
-        ).all()
-        
-        # Add job_title to each application
-        result = []
-        for app, job_title in applications:
-            app.job_title = job_title
-            result.append(app)
-        return result
-    
-    return []
+        # Get all applications for jobs posted by this hiring manager with job titles.
+        # Take the top of each job's list straight off its index, then merge that small
+        # candidate set, instead of joining and sorting every application of every job.
+        manager_jobs = select(Job.id, Job.title).where(Job.hiring_manager_id == user.id).subquery()
+        latest = keyset(
+            select(*_APPLICATION_OUT_COLUMNS).where(Application.job_id == manager_jobs.c.id),
+            Application.submitted_at,
+            Application.id,
+            cursor,
+            limit,
+        ).subquery().lateral()
+        stmt = select(latest, manager_jobs.c.title.label("job_title")).select_from(manager_jobs).join(latest, true())
+        rows = (await db.execute(keyset(stmt, latest.c.submitted_at, latest.c.id, None, limit))).all()
+        return _application_page(rows, limit)
+
+    return {"items": [], "next_cursor": None}
+
+
+def _naive_utc(value):
+    # submitted_at is stored as naive UTC.
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def update_application_statuses(db: AsyncSession, hiring_manager_user, data: BulkStatusUpdate):
+    """
+    Set the status of many applications, chosen by id or by filter, in one statement.
+    Ownership is part of the UPDATE (joined to jobs), so applications on other managers'
+    jobs are never touched and are reported as not found.
+    """
+    stmt = (
+        update(Application)
+        .where(Application.job_id == Job.id, Job.hiring_manager_id == hiring_manager_user.id)
+        .values(status=data.status)
+        .returning(Application.id, Application.status)
+        .execution_options(synchronize_session=False)
+    )
+    if data.application_ids is not None:
+        stmt = stmt.where(Application.id.in_(data.application_ids))
+    else:
+        f = data.filter
+        if f.job_id is not None:
+            stmt = stmt.where(Application.job_id == f.job_id)
+        if f.status is not None:
+            stmt = stmt.where(Application.status == f.status)
+        if f.submitted_before is not None:
+            stmt = stmt.where(Application.submitted_at < _naive_utc(f.submitted_before))
+        if f.submitted_after is not None:
+            stmt = stmt.where(Application.submitted_at >= _naive_utc(f.submitted_after))
+
+    rows = (await db.execute(stmt)).all()
+    await db.commit()
+
+    updated = {row.id: row.status for row in rows}
+    if data.application_ids is None:
+        results = [{"id": app_id, "result": "updated", "status": status} for app_id, status in updated.items()]
+    else:
+        results = [
+            {"id": app_id, "result": "updated", "status": updated[app_id]}
+            if app_id in updated
+            else {"id": app_id, "result": "not_found"}
+            for app_id in dict.fromkeys(data.application_ids)
+        ]
+    return {"updated": len(rows), "results": results}
@@ -1,14 +1,166 @@
+import asyncio
+import logging
 import os
 from email.message import EmailMessage
 import aiosmtplib
 
+from app.metrics import EMAILS_TOTAL, EMAIL_QUEUE_DEPTH, EMAIL_SMTP_CONNECTS_TOTAL
+from app.observability import span
+
 SMTP_HOST = os.getenv("SMTP_HOST")
 SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
-SMTP_USERNAME = os.getenv("SMTP_USERNAME")
-SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+# Empty means no AUTH, e.g. for a local relay.
+SMTP_USERNAME = os.getenv("SMTP_USERNAME") or None
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD") or None
+SMTP_START_TLS = os.getenv("SMTP_START_TLS", "true").lower() == "true"
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", "20"))
 FROM_EMAIL = os.getenv("SMTP_FROM_EMAIL") or SMTP_USERNAME
 FROM_NAME = os.getenv("SMTP_FROM_NAME", "Hiring Team")
 EMAIL_ENABLED = os.getenv("EMAIL_ENABLED", "true").lower() == "true"
+# Senders each keep one SMTP session open and deliver queued mail over it in
+# batches, so a burst of applications costs a few handshakes, not one each.
+EMAIL_SMTP_CONNECTIONS = int(os.getenv("EMAIL_SMTP_CONNECTIONS", "8"))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+# Queuing waits once this many messages are pending, which slows producers
+# instead of growing memory without bound.
+EMAIL_QUEUE_SIZE = int(os.getenv("EMAIL_QUEUE_SIZE", "10000"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "1"))
+# Sessions idle this long are closed before the server drops them.
+EMAIL_IDLE_SECONDS = float(os.getenv("EMAIL_IDLE_SECONDS", "30"))
+EMAIL_DRAIN_SECONDS = float(os.getenv("EMAIL_DRAIN_SECONDS", "20"))
+
+logger = logging.getLogger(__name__)
+
+_queue: asyncio.Queue | None = None
+_senders: list[asyncio.Task] = []
+
+
+def _smtp() -> aiosmtplib.SMTP:
+    return aiosmtplib.SMTP(
+        hostname=SMTP_HOST,
+        port=SMTP_PORT,
+        start_tls=SMTP_START_TLS,
+        username=SMTP_USERNAME,
+        password=SMTP_PASSWORD,
+        timeout=SMTP_TIMEOUT_SECONDS,
+    )
+
+
+async def _close(smtp: aiosmtplib.SMTP | None):
+    if smtp is None or not smtp.is_connected:
+        return
+    try:
+        await smtp.quit()
+    except (aiosmtplib.SMTPException, OSError):
+        smtp.close()
+
+
+def _is_permanent(exc: Exception) -> bool:
+    # 5xx replies (unknown mailbox, rejected sender, bad credentials) will not
+    # succeed on a retry; 4xx replies, timeouts and dropped connections might.
+    if isinstance(exc, aiosmtplib.SMTPRecipientsRefused):
+        return all(e.code >= 500 for e in exc.recipients)
+    return isinstance(exc, aiosmtplib.SMTPResponseException) and exc.code >= 500
+
+
+async def _deliver(smtp: aiosmtplib.SMTP | None, msg: EmailMessage) -> aiosmtplib.SMTP | None:
+    """Send `msg`, reconnecting and backing off as needed. Returns the session to reuse."""
+    for attempt in range(1, EMAIL_MAX_ATTEMPTS + 1):
+        try:
+            if smtp is None or not smtp.is_connected:
+                smtp = _smtp()
+                await smtp.connect()
+                EMAIL_SMTP_CONNECTS_TOTAL.inc()
+            with span("smtp_send"):
+                await smtp.send_message(msg)
+            EMAILS_TOTAL.labels("sent").inc()
+            return smtp
+        except (aiosmtplib.SMTPException, OSError, asyncio.TimeoutError) as e:
+            refused = isinstance(e, (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused))
+            if not refused or getattr(e, "code", None) == 421:
+                # Connection trouble, or the server closing the channel: start over on a
+                # fresh session. After other refusals aiosmtplib has already sent RSET.
+                await _close(smtp)
+                smtp = None
+            if _is_permanent(e) or attempt == EMAIL_MAX_ATTEMPTS:
+                EMAILS_TOTAL.labels("failed").inc()
+                logger.warning("Giving up on email to %s after %d attempt(s): %s", msg["To"], attempt, e)
+                return smtp
+            EMAILS_TOTAL.labels("retried").inc()
+            await asyncio.sleep(EMAIL_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+    return smtp
+
+
+async def _sender(queue: asyncio.Queue):
+    smtp = None
+    try:
+        while True:
+            try:
+                if smtp is None:
+                    msg = await queue.get()
+                else:
+                    msg = await asyncio.wait_for(queue.get(), EMAIL_IDLE_SECONDS)
+            except asyncio.TimeoutError:
+                await _close(smtp)
+                smtp = None
+                continue
+
+            # Take whatever else is already waiting and send it over the same session.
+            batch = [msg]
+            while len(batch) < EMAIL_BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+            EMAIL_QUEUE_DEPTH.set(queue.qsize())
+            for msg in batch:
+                try:
+                    smtp = await _deliver(smtp, msg)
+                except Exception:
+                    # Anything _deliver does not expect (a malformed message, a bug) costs
+                    # this message only; the sender keeps serving the queue on a fresh session.
+                    EMAILS_TOTAL.labels("failed").inc()
+                    logger.exception("Unexpected error sending email to %s", msg["To"])
+                    if smtp is not None:
+                        smtp.close()
+                    smtp = None
+                finally:
+                    queue.task_done()
+    finally:
+        await _close(smtp)
+
+
+async def start_email_sender():
+    global _queue, _senders
+    if not EMAIL_ENABLED or _queue is not None:
+        return
+    _queue = asyncio.Queue(maxsize=EMAIL_QUEUE_SIZE)
+    _senders = [asyncio.create_task(_sender(_queue)) for _ in range(EMAIL_SMTP_CONNECTIONS)]
+
+
+async def stop_email_sender():
+    """Deliver what is queued (for up to EMAIL_DRAIN_SECONDS), then close the sessions."""
+    global _queue, _senders
+    if _queue is None:
+        return
+    try:
+        await asyncio.wait_for(_queue.join(), EMAIL_DRAIN_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Shutting down with %d email(s) still queued", _queue.qsize())
+    for task in _senders:
+        task.cancel()
+    await asyncio.gather(*_senders, return_exceptions=True)
+    _queue, _senders = None, []
+    EMAIL_QUEUE_DEPTH.set(0)
+
+
+async def send_email(msg: EmailMessage):
+    """Queue `msg` for the pooled senders; waits while the queue is full."""
+    if _queue is None:
+        # No senders running (e.g. a script outside the app): one-off session.
+        smtp = await _deliver(None, msg)
+        await _close(smtp)
+        return
+    await _queue.put(msg)
+    EMAIL_QUEUE_DEPTH.set(_queue.qsize())
 
 
 async def send_application_confirmation(
@@ -31,12 +183,4 @@ async def send_application_confirmation(
         f"{FROM_NAME}\n"
     )
 
-    await aiosmtplib.send(
-        msg,
-        hostname=SMTP_HOST,
-        port=SMTP_PORT,
-        start_tls=True,
-        username=SMTP_USERNAME,
-        password=SMTP_PASSWORD,
-        timeout=20,
-    )
+    await send_email(msg)
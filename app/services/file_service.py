@@ -1,7 +1,10 @@
 import os
+import shutil
 import uuid
 from fastapi import UploadFile
 
+from app.storage import STORAGE_CHUNK_BYTES
+
 UPLOAD_DIR = "uploads"
 
 def save_upload(file: UploadFile) -> str:
@@ -11,6 +14,6 @@ def save_upload(file: UploadFile) -> str:
     path = os.path.join(UPLOAD_DIR, filename)
 
     with open(path, "wb") as f:
-        f.write(file.file.read())
+        shutil.copyfileobj(file.file, f, STORAGE_CHUNK_BYTES)
 
     return path
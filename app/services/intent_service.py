@@ -0,0 +1,168 @@
+"""
+Deterministic answers for the assistant's most common commands.
+
+`match_intent` recognises a handful of phrasings ("show my jobs", "applicants
+for job 12", "how many applications") and `answer_intent` answers them with
+fixed, parameterized SQL. Anything else returns None and goes to the agent.
+"""
+import re
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent_cache import normalize_command
+from app.metrics import AGENT_FAST_PATH_TOTAL
+
+FAST_PATH_LIMIT = 50
+# jobs.id is a Postgres integer; a larger id cannot exist and would fail the query.
+_MAX_JOB_ID = 2**31 - 1
+
+_JOB_REF = r"(?:the )?(?:job |role |position )?(?:#|id |number )?(?:(?P<job_id>\d+)|['\"]?(?P<title>[^'\"]+?)['\"]?(?: job| role| position)?)"
+
+_INTENTS = [
+    ("list_jobs", re.compile(
+        r"^(?:please )?(?:(?:show|list|get|display|view|see)(?: me)?(?: all)?(?: of)? |what are )?my"
+        r"(?: current| open| posted)? (?:jobs|job postings|job posts|postings|openings)$"
+    )),
+    ("status_counts", re.compile(
+        r"^(?:(?:show|get|give me)(?: me)?(?: the)? )?(?:application |applicant )?status"
+        r" (?:counts|count|breakdown|summary|totals)(?: (?:for|of|on) " + _JOB_REF + r")?$"
+    )),
+    ("status_counts", re.compile(
+        r"^(?:how many|count(?: the)?|count of) (?:applicants|applications|candidates)"
+        r"(?: do i have| are there| have i got)?(?: by status)?(?: (?:for|on|to) " + _JOB_REF + r")?(?: by status)?$"
+    )),
+    ("job_applicants", re.compile(
+        r"^(?:please )?(?:(?:show|list|get|display|view|see)(?: me)?(?: the| all)?(?: of the)? |who are the )?"
+        r"(?:applicants|applications|candidates) (?:for|to|on) " + _JOB_REF + r"$"
+    )),
+    ("job_applicants", re.compile(r"^who (?:has )?applied (?:to|for) " + _JOB_REF + r"$")),
+]
+
+_LIST_JOBS = text("""
+    SELECT j.id, j.title, j.location, j.salary, j.posted_at,
+           (SELECT CAST(coalesce(sum(c.count), 0) AS bigint) FROM job_status_counts c WHERE c.job_id = j.id) AS applicants
+    FROM jobs j
+    WHERE j.hiring_manager_id = :manager_id
+    ORDER BY j.posted_at DESC, j.id DESC
+    LIMIT :limit
+""")
+
+_JOBS_BY_TITLE = text("""
+    SELECT id, title FROM jobs
+    WHERE hiring_manager_id = :manager_id AND lower(title) = :title
+    LIMIT 2
+""")
+
+_JOB_BY_ID = text("""
+    SELECT id, title FROM jobs
+    WHERE id = :job_id AND hiring_manager_id = :manager_id
+""")
+
+_JOB_APPLICANTS = text("""
+    SELECT full_name, email, status, submitted_at
+    FROM applications
+    WHERE job_id = :job_id
+    ORDER BY submitted_at DESC, id DESC
+    LIMIT :limit
+""")
+
+# Read from the trigger-maintained job_status_counts: one row per job and status.
+_STATUS_COUNTS = text("""
+    SELECT c.status, CAST(sum(c.count) AS bigint) AS n
+    FROM jobs j
+    JOIN job_status_counts c ON c.job_id = j.id
+    WHERE j.hiring_manager_id = :manager_id AND c.count > 0
+    GROUP BY c.status
+    ORDER BY c.status
+""")
+
+_JOB_STATUS_COUNTS = text("""
+    SELECT status, count AS n
+    FROM job_status_counts
+    WHERE job_id = :job_id AND count > 0
+    ORDER BY status
+""")
+
+
+def match_intent(command: str) -> tuple[str, dict] | None:
+    normalized = normalize_command(command)
+    for name, pattern in _INTENTS:
+        match = pattern.match(normalized)
+        if match:
+            return name, {k: v for k, v in match.groupdict().items() if v}
+    return None
+
+
+async def _resolve_job(db: AsyncSession, manager_id: str, params: dict):
+    """The manager's job named by id or exact title, or None if absent or ambiguous."""
+    if "job_id" in params:
+        job_id = int(params["job_id"])
+        if job_id > _MAX_JOB_ID:
+            return None
+        return (await db.execute(_JOB_BY_ID, {"job_id": job_id, "manager_id": manager_id})).first()
+    rows = (await db.execute(_JOBS_BY_TITLE, {"title": params["title"], "manager_id": manager_id})).all()
+    return rows[0] if len(rows) == 1 else None
+
+
+async def _list_jobs(db: AsyncSession, manager_id: str, params: dict) -> str | None:
+    rows = (await db.execute(_LIST_JOBS, {"manager_id": manager_id, "limit": FAST_PATH_LIMIT})).all()
+    if not rows:
+        return "You haven't posted any jobs yet."
+    lines = [f"Your jobs, most recent first (showing {len(rows)}):", ""]
+    for r in rows:
+        lines.append(
+            f"- **#{r.id} {r.title}** — {r.location}, salary: {r.salary or 'Not specified'}, "
+            f"{r.applicants} applicant(s), posted {r.posted_at:%Y-%m-%d}"
+        )
+    return "\n".join(lines)
+
+
+async def _job_applicants(db: AsyncSession, manager_id: str, params: dict) -> str | None:
+    job = await _resolve_job(db, manager_id, params)
+    if job is None:
+        # Unknown or ambiguous; the agent can ask the user which job they mean.
+        return None
+    rows = (await db.execute(_JOB_APPLICANTS, {"job_id": job.id, "limit": FAST_PATH_LIMIT})).all()
+    if not rows:
+        return f"No one has applied to **#{job.id} {job.title}** yet."
+    lines = [f"Applicants for **#{job.id} {job.title}**, most recent first (showing {len(rows)}):", ""]
+    for r in rows:
+        lines.append(f"- {r.full_name} ({r.email}) — {r.status}, applied {r.submitted_at:%Y-%m-%d}")
+    return "\n".join(lines)
+
+
+async def _status_counts(db: AsyncSession, manager_id: str, params: dict) -> str | None:
+    if params:
+        job = await _resolve_job(db, manager_id, params)
+        if job is None:
+            return None
+        rows = (await db.execute(_JOB_STATUS_COUNTS, {"job_id": job.id})).all()
+        scope = f"**#{job.id} {job.title}**"
+    else:
+        rows = (await db.execute(_STATUS_COUNTS, {"manager_id": manager_id})).all()
+        scope = "your jobs"
+    total = sum(r.n for r in rows)
+    if not total:
+        return f"There are no applications for {scope} yet."
+    lines = [f"{total} application(s) for {scope}:", ""]
+    lines.extend(f"- {r.status}: {r.n}" for r in rows)
+    return "\n".join(lines)
+
+
+_HANDLERS = {
+    "list_jobs": _list_jobs,
+    "job_applicants": _job_applicants,
+    "status_counts": _status_counts,
+}
+
+
+async def answer_intent(db: AsyncSession, command: str, manager_id) -> str | None:
+    """Reply to `command` without the LLM, or None if it needs the agent."""
+    intent = match_intent(command)
+    if intent is None:
+        return None
+    name, params = intent
+    reply = await _HANDLERS[name](db, str(manager_id), params)
+    if reply is not None:
+        AGENT_FAST_PATH_TOTAL.labels(name).inc()
+    return reply
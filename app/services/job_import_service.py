@@ -0,0 +1,286 @@
+"""
+Bulk job import (POST /job/import) from a CSV or NDJSON stream.
+
+The body is read as it arrives and never held whole: records are validated
+against JobCreate one by one, and the valid ones are copied with COPY into a
+temporary staging table every JOB_IMPORT_CHUNK_ROWS rows. At the end, one
+INSERT ... SELECT merges the staging table into jobs and the transaction
+commits, so an import lands all at once or not at all. Memory stays bounded
+by the chunk size, the longest record and the error report, which keeps the
+first JOB_IMPORT_MAX_ERRORS rejected rows and counts the rest.
+
+Rows identical to one of the manager's existing jobs, or to an earlier row of
+the same file, are skipped, so re-running an export does not post twice.
+"""
+import codecs
+import csv
+import json
+import os
+from collections import deque
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.catalogue_cache import invalidate_job_catalogue
+from app.observability import span
+from app.schemas.job import JobCreate
+
+JOB_IMPORT_CHUNK_ROWS = int(os.getenv("JOB_IMPORT_CHUNK_ROWS", "1000"))
+JOB_IMPORT_MAX_ERRORS = int(os.getenv("JOB_IMPORT_MAX_ERRORS", "1000"))
+# Longest accepted record; also caps what a body without newlines can buffer.
+JOB_IMPORT_MAX_RECORD_CHARS = int(os.getenv("JOB_IMPORT_MAX_RECORD_CHARS", "1000000"))
+
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+_FIELDS = tuple(JobCreate.model_fields)
+_REQUIRED = tuple(name for name, field in JobCreate.model_fields.items() if field.is_required())
+
+_STAGING_SQL = """
+CREATE TEMP TABLE job_import (
+    line int NOT NULL,
+    title text NOT NULL,
+    description text NOT NULL,
+    location text NOT NULL,
+    salary text
+) ON COMMIT DROP
+"""
+
+# posted_at is a client-side default on the model, so it is set here explicitly.
+_MERGE_SQL = """
+INSERT INTO jobs (title, description, location, salary, posted_at, hiring_manager_id)
+SELECT title, description, location, salary, now() AT TIME ZONE 'utc', :manager_id
+FROM (
+    SELECT DISTINCT ON (title, description, location, salary) *
+    FROM job_import
+    ORDER BY title, description, location, salary, line
+) s
+WHERE NOT EXISTS (
+    SELECT 1 FROM jobs j
+    WHERE j.hiring_manager_id = :manager_id
+      AND j.title = s.title
+      AND j.description = s.description
+      AND j.location = s.location
+      AND j.salary IS NOT DISTINCT FROM s.salary
+)
+ORDER BY line
+"""
+
+
+def _too_long(line: int):
+    return HTTPException(
+        status_code=413, detail=f"Record at line {line} is longer than {JOB_IMPORT_MAX_RECORD_CHARS} characters"
+    )
+
+
+async def _line_batches(chunks):
+    """Decoded lines (with their endings) from a stream of byte chunks, as (number, line) lists per chunk."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    number = 0
+    try:
+        async for chunk in chunks:
+            # Split on \n only: \r\n endings stay intact for csv, and other Unicode
+            # line breaks inside a field are not record boundaries.
+            *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+            if len(pending) > JOB_IMPORT_MAX_RECORD_CHARS:
+                raise _too_long(number + len(lines) + 1)
+            if lines:
+                yield [(number + i, line + "\n") for i, line in enumerate(lines, 1)]
+                number += len(lines)
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        # `pending` holds no newline, so the bad line is counted within the bytes being decoded.
+        line = number + 1 + e.object[:e.start].count(b"\n")
+        raise HTTPException(status_code=400, detail=f"Line {line} is not valid UTF-8")
+    if pending:
+        yield [(number + 1, pending)]
+
+
+async def _lines(chunks):
+    """(number, line) per decoded line of a stream of byte chunks."""
+    async for batch in _line_batches(chunks):
+        for item in batch:
+            yield item
+
+
+class _Feed:
+    """
+    Input for a single csv.reader, refilled with lines as they arrive. It notes
+    the lines behind the record being parsed, and whether the reader asked for
+    more than was buffered: then the record is not complete yet.
+    """
+
+    def __init__(self):
+        self.lines = deque()
+        self.taken = []
+        self.ran_dry = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.lines:
+            self.ran_dry = bool(self.taken)
+            raise StopIteration
+        item = self.lines.popleft()
+        self.taken.append(item)
+        return item[1]
+
+
+def _complete_records(reader, feed: _Feed, final: bool):
+    """(line, values) per buffered record that is complete; a partial one goes back into the feed."""
+    while feed.lines:
+        feed.taken, feed.ran_dry = [], False
+        start = feed.lines[0][0]
+        try:
+            values = next(reader)
+        except csv.Error as e:
+            raise HTTPException(status_code=400, detail=f"Malformed CSV at line {start}: {e}")
+        size = sum(len(line) for _, line in feed.taken)
+        if size > JOB_IMPORT_MAX_RECORD_CHARS:
+            raise _too_long(start)
+        if feed.ran_dry:
+            # The input ended inside a quoted field. The reader starts the next
+            # record afresh, so it re-reads these lines once more have arrived.
+            if final:
+                raise HTTPException(status_code=400, detail=f"Unterminated quoted field at line {start}")
+            feed.lines.extendleft(reversed(feed.taken))
+            return
+        yield start, values
+
+
+async def _csv_records(chunks):
+    """(line, dict) per CSV record, keyed by the lower-cased header; empty cells are missing."""
+    header = None
+    feed = _Feed()
+    reader = csv.reader(feed)
+    batches = _line_batches(chunks)
+    final = False
+    while not final:
+        batch = await anext(batches, None)
+        if batch is None:
+            final = True
+        else:
+            feed.lines.extend(batch)
+        for start, values in _complete_records(reader, feed, final):
+            if not any(v.strip() for v in values):
+                continue
+            if header is None:
+                header = [v.strip().lower() for v in values]
+                missing = [name for name in _REQUIRED if name not in header]
+                if missing:
+                    raise HTTPException(status_code=400, detail=f"CSV header is missing columns: {', '.join(missing)}")
+                continue
+            yield start, {
+                name: value for name, value in zip(header, values)
+                if name in _FIELDS and value.strip()
+            }
+
+
+async def _ndjson_records(chunks):
+    """(line, value) per non-blank NDJSON line; a line that is not JSON yields its parse error."""
+    async for number, line in _lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, e
+
+
+def _validate(record) -> tuple[JobCreate | None, list[dict]]:
+    if isinstance(record, json.JSONDecodeError):
+        return None, [{"field": None, "message": f"Invalid JSON: {record.msg}"}]
+    try:
+        job = JobCreate.model_validate(record)
+    except ValidationError as e:
+        return None, [
+            {"field": ".".join(str(part) for part in err["loc"]) or None, "message": err["msg"]}
+            for err in e.errors(include_url=False)
+        ]
+    # Postgres text cannot hold NUL, and COPY would fail the whole import on it.
+    bad = [name for name in _FIELDS if "\x00" in (getattr(job, name) or "")]
+    if bad:
+        return None, [{"field": name, "message": "Contains a NUL character"} for name in bad]
+    return job, []
+
+
+async def _copy(driver_connection, rows: list[tuple]):
+    with span("job_import_copy"):
+        async with driver_connection.cursor() as cursor:
+            async with cursor.copy("COPY job_import (line, title, description, location, salary) FROM STDIN") as copy:
+                for row in rows:
+                    await copy.write_row(row)
+
+
+def _report(received: int, valid: int, rejected: int, imported: int, errors: list) -> dict:
+    return {
+        "received": received,
+        "imported": imported,
+        "duplicates": valid - imported,
+        "rejected": rejected,
+        "errors": errors,
+        "errors_truncated": rejected > len(errors),
+    }
+
+
+async def _prepend(first, records):
+    yield first
+    async for record in records:
+        yield record
+
+
+async def import_jobs(db: AsyncSession, chunks, fmt: str, manager_id) -> dict:
+    """
+    Import jobs for `manager_id` from `chunks`, an async iterator of bytes in
+    `fmt` ("csv" or "ndjson"). Valid rows are imported even when others are
+    rejected; a malformed stream (bad encoding, CSV structure or header) fails
+    the whole import with 400, an oversized record with 413.
+    """
+    records = _csv_records(chunks) if fmt == "csv" else _ndjson_records(chunks)
+    # Wait for the first record (past the CSV header) before taking a connection
+    # and opening the staging transaction, so a client that stalls or sends a bad
+    # header never holds one.
+    first = await anext(records, None)
+    if first is None:
+        return _report(0, 0, 0, 0, [])
+    received = valid = rejected = 0
+    errors = []
+    batch = []
+    try:
+        conn = await db.connection()
+        await conn.execute(text(_STAGING_SQL))
+        driver_connection = (await conn.get_raw_connection()).driver_connection
+        async for line, record in _prepend(first, records):
+            received += 1
+            job, problems = _validate(record)
+            if problems:
+                rejected += 1
+                if len(errors) < JOB_IMPORT_MAX_ERRORS:
+                    errors.append({"line": line, "errors": problems})
+                continue
+            valid += 1
+            batch.append((line, job.title, job.description, job.location, job.salary))
+            if len(batch) >= JOB_IMPORT_CHUNK_ROWS:
+                await _copy(driver_connection, batch)
+                batch.clear()
+        if batch:
+            await _copy(driver_connection, batch)
+        imported = (await conn.execute(text(_MERGE_SQL), {"manager_id": manager_id})).rowcount
+        await db.commit()
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to import jobs")
+
+    if imported:
+        invalidate_job_catalogue()
+    return _report(received, valid, rejected, imported, errors)
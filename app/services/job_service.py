@@ -1,14 +1,25 @@
+import json
+import time
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import select, exists, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, exists, literal, func, cast, Double, BigInteger
 from app.models.application import Application
 
 from app.models.job import Job
+from app.models.job_status_count import JobStatusCount
 from app.schemas.job import JobCreate
-from app.agent import build_hiring_manager_agent
+from agno.run.agent import RunContentEvent, RunCompletedEvent, RunErrorEvent, ToolCallStartedEvent, ToolCallCompletedEvent
+from agno.run.base import RunStatus
+from app.agent import get_hiring_manager_agent, WRITE_TOOLS
+from app.agent_cache import reply_key, get_cached_reply, cache_reply
+from app.catalogue_cache import invalidate_job_catalogue
+from app.services.intent_service import answer_intent
+from app.metrics import AGENT_TIME_TO_FIRST_BYTE_SECONDS, AGENT_RUN_SECONDS, AGENT_RUNS_CANCELLED_TOTAL, SPAN_SECONDS
+from app.pagination import keyset, build_page
+from app.observability import span
 
 
-async def create_job(db: Session, job_data: JobCreate, user_id: str):
+async def create_job(db: AsyncSession, job_data: JobCreate, user_id: str):
     try:
         job = Job(
             title=job_data.title,
@@ -18,31 +29,80 @@ async def create_job(db: Session, job_data: JobCreate, user_id: str):
             hiring_manager_id=user_id,
         )
         db.add(job)
-        db.commit()
-        db.refresh(job)
+        await db.commit()
+        invalidate_job_catalogue()
+        await db.refresh(job)
         return job
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to create job")
 
 
-async def get_jobs_for_manager(db: Session, user_id: str):
+def _job_key(job):
+    return job.posted_at, job.id
+
+
+# Job fields returned by the list endpoints, selected as plain rows.
+_JOB_COLUMNS = (Job.id, Job.title, Job.description, Job.location, Job.salary, Job.posted_at, Job.hiring_manager_id)
+
+
+def _row_page(rows, limit: int, key=_job_key) -> dict:
+    page = build_page(rows, limit, key)
+    page["items"] = [dict(r._mapping) for r in page["items"]]
+    return page
+
+
+async def get_jobs_for_manager(db: AsyncSession, user_id: str, limit: int, cursor: str | None = None):
+    stmt = keyset(select(*_JOB_COLUMNS).where(Job.hiring_manager_id == user_id), Job.posted_at, Job.id, cursor, limit)
     try:
-        jobs = db.scalars(select(Job).where(Job.hiring_manager_id == user_id).order_by(Job.posted_at.desc())).all()
-        return jobs
+        rows = (await db.execute(stmt)).all()
+        return _row_page(rows, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to retrieve jobs")
 
 
-async def get_all_jobs(db: Session):
+async def get_job_dashboard(db: AsyncSession, manager_id, limit: int, cursor: str | None = None) -> dict:
+    """
+    A manager's jobs with their application counts by status, plus totals across
+    all of their jobs. Read from job_status_counts, so the cost follows the number
+    of jobs, not applications.
+    """
+    status_counts = (
+        select(func.jsonb_object_agg(JobStatusCount.status, JobStatusCount.count))
+        .where(JobStatusCount.job_id == Job.id, JobStatusCount.count > 0)
+        .scalar_subquery()
+    )
+    stmt = keyset(
+        select(Job.id, Job.title, Job.location, Job.posted_at, status_counts.label("status_counts"))
+        .where(Job.hiring_manager_id == manager_id),
+        Job.posted_at, Job.id, cursor, limit,
+    )
+    totals = (
+        select(JobStatusCount.status, cast(func.sum(JobStatusCount.count), BigInteger).label("n"))
+        .join(Job, Job.id == JobStatusCount.job_id)
+        .where(Job.hiring_manager_id == manager_id, JobStatusCount.count > 0)
+        .group_by(JobStatusCount.status)
+    )
+    page = build_page((await db.execute(stmt)).all(), limit, _job_key)
+    items = []
+    for r in page["items"]:
+        counts = r.status_counts or {}
+        items.append({**r._mapping, "status_counts": counts, "applications": sum(counts.values())})
+    page["items"] = items
+    page["totals"] = {r.status: r.n for r in (await db.execute(totals)).all()}
+    return page
+
+
+async def get_all_jobs(db: AsyncSession, limit: int, cursor: str | None = None):
     """Get all available jobs for browsing"""
+    stmt = keyset(select(*_JOB_COLUMNS), Job.posted_at, Job.id, cursor, limit)
     try:
-        jobs = db.scalars(select(Job).order_by(Job.posted_at.desc())).all()
-        return jobs
+        rows = (await db.execute(stmt)).all()
+        return _row_page(rows, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to retrieve jobs")
 
-async def list_jobs_for_applicant(db, applicant_id):
+async def list_jobs_for_applicant(db, applicant_id, limit: int, cursor: str | None = None):
     has_applied_expr = (
         exists(
             select(1).where(
@@ -52,38 +112,157 @@ async def list_jobs_for_applicant(db, applicant_id):
         )
     ).label("has_applied")
 
-    rows = db.execute(
+    stmt = select(
+        Job.id,
+        Job.title,
+        Job.description,
+        Job.location,
+        Job.salary,
+        Job.posted_at,
+        has_applied_expr,
+    )
+    rows = (await db.execute(keyset(stmt, Job.posted_at, Job.id, cursor, limit))).all()
+    return _row_page(rows, limit)
+
+async def search_jobs(db: AsyncSession, q: str, limit: int, cursor: str | None = None):
+    """Rank jobs against a web-style query (quotes, OR, -exclusions) with highlighted snippets."""
+    query = func.websearch_to_tsquery("english", q)
+    # Cast to double so the rank round-trips exactly through the cursor.
+    rank = cast(func.ts_rank_cd(Job.search_vector, query), Double)
+
+    ranked = keyset(
+        select(Job.id, rank.label("rank")).where(Job.search_vector.op("@@")(query)),
+        rank,
+        Job.id,
+        cursor,
+        limit,
+    ).subquery()
+
+    # Headlines are costly, so they are only built for the rows on this page.
+    marks = "StartSel=<mark>, StopSel=</mark>"
+    stmt = (
         select(
             Job.id,
             Job.title,
-            Job.description,
             Job.location,
             Job.salary,
             Job.posted_at,
-            has_applied_expr,
-        ).order_by(Job.posted_at.desc())
-    ).all()
-
-    return [
-        {
-            "id": r.id,
-            "title": r.title,
-            "description": r.description,
-            "location": r.location,
-            "salary": r.salary,
-            "posted_at": r.posted_at,
-            "has_applied": bool(r.has_applied),
-        }
-        for r in rows
-    ]
-
-async def get_jobs(command: str, user_id: str):
+            ranked.c.rank,
+            func.ts_headline("english", Job.title, query, f"{marks}, HighlightAll=true").label("title_highlight"),
+            func.ts_headline("english", Job.description, query, f"{marks}, MaxFragments=2, MaxWords=30, MinWords=10").label("snippet"),
+        )
+        .join(ranked, ranked.c.id == Job.id)
+        .order_by(ranked.c.rank.desc(), Job.id.desc())
+    )
     try:
-        print("USER ID IN GET JOBS:", user_id)
-        agent = await build_hiring_manager_agent(user_id)
-        print(command)
-        response = agent.run(command)  # returns RunResponse
-        print("RESPONSE", response)
+        rows = (await db.execute(stmt)).all()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to search jobs")
+
+    return _row_page(rows, limit, lambda r: (r.rank, r.id))
+
+
+async def get_jobs(db: AsyncSession, command: str, user_id: str):
+    started = time.perf_counter()
+    fast_reply = await answer_intent(db, command, user_id)
+    if fast_reply is not None:
+        AGENT_TIME_TO_FIRST_BYTE_SECONDS.labels("blocking").observe(time.perf_counter() - started)
+        return {"reply": fast_reply}
+
+    key = await reply_key(db, user_id, command)
+    cached = get_cached_reply(key)
+    if cached is not None:
+        AGENT_TIME_TO_FIRST_BYTE_SECONDS.labels("blocking").observe(time.perf_counter() - started)
+        return {"reply": cached}
+
+    try:
+        agent = get_hiring_manager_agent()
+        with span("agent_run"):
+            response = await agent.arun(
+                command,
+                user_id=str(user_id),
+                dependencies={"hiring_manager_id": str(user_id)},
+            )
+        # Nothing reaches the client before the run ends, so first byte and run time coincide.
+        elapsed = time.perf_counter() - started
+        AGENT_TIME_TO_FIRST_BYTE_SECONDS.labels("blocking").observe(elapsed)
+        AGENT_RUN_SECONDS.labels("blocking").observe(elapsed)
+        used_tools = {t.tool_name for t in response.tools or []}
+        if response.status == RunStatus.completed and isinstance(response.content, str) and not used_tools & WRITE_TOOLS:
+            cache_reply(key, response.content)
         return {"reply": response.content}
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to process job search command")
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def stream_jobs(db: AsyncSession, command: str, user_id: str):
+    """
+    Run the agent on `command`, yielding Server-Sent Events while it works:
+    `token` for each piece of the reply, `tool_call_started` / `tool_call_completed`
+    around each tool, then `done` with the full reply, or `error`.
+
+    Closing the generator (the client disconnected) cancels the agent run.
+    Fast-path and cached replies are sent as a single token followed by `done`.
+    """
+    started = time.perf_counter()
+    key = await reply_key(db, user_id, command)
+    reply = await answer_intent(db, command, user_id) or get_cached_reply(key)
+    if reply is not None:
+        AGENT_TIME_TO_FIRST_BYTE_SECONDS.labels("stream").observe(time.perf_counter() - started)
+        yield _sse("token", {"content": reply})
+        yield _sse("done", {"reply": reply})
+        return
+
+    first_byte_sent = False
+    finished = False
+    failed = False
+    wrote = False
+    agent = get_hiring_manager_agent()
+    events = agent.arun(
+        command,
+        stream=True,
+        stream_events=True,
+        user_id=str(user_id),
+        dependencies={"hiring_manager_id": str(user_id)},
+    )
+    try:
+        async for event in events:
+            if isinstance(event, RunContentEvent):
+                if not event.content:
+                    continue
+                message = _sse("token", {"content": event.content})
+            elif isinstance(event, ToolCallStartedEvent):
+                wrote = wrote or (event.tool is not None and event.tool.tool_name in WRITE_TOOLS)
+                message = _sse("tool_call_started", {"tool": event.tool.tool_name if event.tool else None})
+            elif isinstance(event, ToolCallCompletedEvent):
+                message = _sse("tool_call_completed", {"tool": event.tool.tool_name if event.tool else None})
+            elif isinstance(event, RunCompletedEvent):
+                finished = True
+                if isinstance(event.content, str) and not wrote:
+                    cache_reply(key, event.content)
+                message = _sse("done", {"reply": event.content})
+            elif isinstance(event, RunErrorEvent):
+                finished = failed = True
+                message = _sse("error", {"detail": "Failed to process job search command"})
+            else:
+                continue
+
+            if not first_byte_sent:
+                first_byte_sent = True
+                AGENT_TIME_TO_FIRST_BYTE_SECONDS.labels("stream").observe(time.perf_counter() - started)
+            yield message
+    except Exception as e:
+        finished = failed = True
+        yield _sse("error", {"detail": "Failed to process job search command"})
+    finally:
+        if not finished:
+            AGENT_RUNS_CANCELLED_TOTAL.inc()
+        # Throws GeneratorExit into a run still in flight, which agno records as cancelled.
+        await events.aclose()
+        elapsed = time.perf_counter() - started
+        AGENT_RUN_SECONDS.labels("stream").observe(elapsed)
+        SPAN_SECONDS.labels("agent_run", "error" if failed else "ok" if finished else "cancelled").observe(elapsed)
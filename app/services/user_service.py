@@ -1,34 +1,42 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import String, cast, select
 
+from app.models.data_version import DataVersion
 from app.models.user import User
 from app.schemas.user import User as UserSchema, LoginIn
 from app.security import hash_password, verify_password, create_access_token
-async def create_user(db: Session, user_data: UserSchema):
+async def create_user(db: AsyncSession, user_data: UserSchema):
     if user_data.role not in ("hiring_manager", "applicant"):
         raise HTTPException(status_code=400, detail="role must be hiring_manager or applicant")
 
-    existing = db.scalar(select(User).where(User.email == user_data.email))
+    existing = await db.scalar(select(User).where(User.email == user_data.email))
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     user = User(
         email=user_data.email,
-        password_hash=hash_password(user_data.password),
+        password_hash=await hash_password(user_data.password),
         role=user_data.role,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     return {"id": str(user.id), "email": user.email, "role": user.role}
 
 
-async def authenticate_user(db: Session, payload: LoginIn):
-    user = db.scalar(select(User).where(User.email == payload.email))
-    if not user or not verify_password(payload.password, user.password_hash):
+async def authenticate_user(db: AsyncSession, payload: LoginIn):
+    # The version is read in the same statement as the row, so the token's role
+    # claim is exactly the role at that version.
+    row = (await db.execute(
+        select(User, DataVersion.version)
+        .outerjoin(DataVersion, DataVersion.scope == "users:" + cast(User.id, String))
+        .where(User.email == payload.email)
+    )).first()
+    if not row or not await verify_password(payload.password, row.User.password_hash):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    token = create_access_token(user_id=str(user.id), role=user.role)
+    user = row.User
+    token = create_access_token(user_id=str(user.id), role=user.role, version=row.version or 0)
     return {"access_token": token, "token_type": "bearer"}
\ No newline at end of file
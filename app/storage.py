@@ -0,0 +1,216 @@
+"""
+CV storage behind one interface, so single-node deployments can keep files on
+local disk and skip S3 entirely.
+
+    STORAGE_BACKEND=s3     # default; configured by the S3_* settings in app/s3.py
+    STORAGE_BACKEND=local  # files under STORAGE_LOCAL_DIR, served by app/routers/storage_router.py
+
+Uploads stream through in STORAGE_CHUNK_BYTES pieces, counting and hashing as
+they go, so memory per upload stays flat whatever the file size.
+"""
+from abc import ABC, abstractmethod
+import hashlib
+import hmac
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import quote
+
+from dotenv import load_dotenv
+
+load_dotenv()
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "s3")
+STORAGE_PREFIX = os.getenv("S3_PREFIX", "applications")
+STORAGE_CHUNK_BYTES = int(os.getenv("STORAGE_CHUNK_BYTES", str(1024 * 1024)))
+STORAGE_LOCAL_DIR = os.getenv("STORAGE_LOCAL_DIR", "uploads")
+STORAGE_URL_EXPIRES_SECONDS = int(os.getenv("STORAGE_URL_EXPIRES_SECONDS", "60"))
+# Prefix for links to locally stored files, e.g. https://api.example.com when the API sits behind a proxy.
+STORAGE_PUBLIC_BASE_URL = os.getenv("STORAGE_PUBLIC_BASE_URL", "").rstrip("/")
+STORAGE_URL_SECRET = os.getenv("STORAGE_URL_SECRET") or os.getenv("JWT_SECRET") or ""
+CV_MAX_BYTES = int(os.getenv("CV_MAX_BYTES", str(10 * 1024 * 1024)))
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class StoredObject:
+    key: str
+    size: int
+    sha256: str
+    content_type: str | None = None
+
+
+def build_cv_key(application_id: str, filename: str) -> str:
+    safe_name = filename.replace("/", "_").replace("\\", "_")
+    return f"{STORAGE_PREFIX}/{application_id}/cv/{safe_name}"
+
+
+class HashingReader:
+    """Read-only wrapper that counts and SHA-256 hashes the bytes read through it."""
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._fileobj.read(size)
+        self._sha256.update(data)
+        self.size += len(data)
+        return data
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+
+class Storage(ABC):
+    """Where CV files live. Methods block on I/O; call them through run_in_threadpool."""
+
+    # Whether clients can upload straight to the store with a presigned POST.
+    supports_direct_upload = False
+
+    @abstractmethod
+    def save(self, key: str, fileobj, content_type: str | None = None) -> StoredObject:
+        ...
+
+    @abstractmethod
+    def head(self, key: str) -> dict | None:
+        """{"size", "content_type"} of the object at `key`, or None if there is none."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the object at `key`; a missing object is not an error."""
+
+    @abstractmethod
+    def download_urls(self, keys) -> dict[str, str]:
+        ...
+
+    def download_url(self, key: str, download_name: str | None = None) -> str:
+        return self.download_urls([key])[key]
+
+    @abstractmethod
+    def presign_upload(self, key: str, content_type: str) -> dict:
+        """Presigned POST for uploading to `key`; only called when supports_direct_upload."""
+
+
+class S3Storage(Storage):
+    supports_direct_upload = True
+
+    def __init__(self):
+        # Imported here so the local backend never needs boto3 settings or a bucket.
+        from app import s3
+        self._s3 = s3
+        self.upload_expires_seconds = s3.S3_UPLOAD_EXPIRES_SECONDS
+
+    def save(self, key, fileobj, content_type=None):
+        reader = HashingReader(fileobj)
+        self._s3.upload_stream(reader, key, content_type)
+        return StoredObject(key=key, size=reader.size, sha256=reader.sha256, content_type=content_type)
+
+    def head(self, key):
+        head = self._s3.head_cv_object(key)
+        if head is None:
+            return None
+        return {"size": head["ContentLength"], "content_type": head.get("ContentType")}
+
+    def delete(self, key):
+        self._s3.delete_cv_object(key)
+
+    def download_urls(self, keys):
+        return self._s3.presign_get_urls(keys)
+
+    def download_url(self, key, download_name=None):
+        return self._s3.presign_get_url(key, download_name)
+
+    def presign_upload(self, key, content_type):
+        return self._s3.presign_cv_upload(key, content_type)
+
+
+class LocalStorage(Storage):
+    """
+    Files under a directory on this machine. Download links are HMAC-signed,
+    expiring URLs to /storage/{key}, mirroring presigned S3 URLs.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root):
+            raise ValueError("Invalid storage key")
+        return path
+
+    def save(self, key, fileobj, content_type=None):
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        reader = HashingReader(fileobj)
+        # Write next to the target and rename, so readers never see a partial file.
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while chunk := reader.read(STORAGE_CHUNK_BYTES):
+                    out.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return StoredObject(key=key, size=reader.size, sha256=reader.sha256, content_type=content_type)
+
+    def head(self, key):
+        try:
+            stat = self.path_for(key).stat()
+        except (FileNotFoundError, ValueError):
+            return None
+        return {"size": stat.st_size, "content_type": None}
+
+    def delete(self, key):
+        path = self.path_for(key)
+        path.unlink(missing_ok=True)
+        # Drop the directories save() created, if nothing else is in them.
+        for parent in path.parents:
+            if parent == self.root:
+                break
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+
+    def download_urls(self, keys):
+        expires = int(time.time()) + STORAGE_URL_EXPIRES_SECONDS
+        return {
+            key: f"{STORAGE_PUBLIC_BASE_URL}/storage/{quote(key)}?expires={expires}&signature={sign_download(key, expires)}"
+            for key in dict.fromkeys(keys)
+        }
+
+    def presign_upload(self, key, content_type):
+        raise NotImplementedError("Direct uploads need the S3 storage backend")
+
+
+def sign_download(key: str, expires: int) -> str:
+    message = f"{key}\n{expires}".encode()
+    return hmac.new(STORAGE_URL_SECRET.encode(), message, hashlib.sha256).hexdigest()
+
+
+def verify_download(key: str, expires: int, signature: str) -> bool:
+    return expires >= time.time() and hmac.compare_digest(sign_download(key, expires), signature)
+
+
+def get_storage() -> Storage:
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                if STORAGE_BACKEND == "local":
+                    _storage = LocalStorage(STORAGE_LOCAL_DIR)
+                elif STORAGE_BACKEND == "s3":
+                    _storage = S3Storage()
+                else:
+                    raise RuntimeError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}; use 's3' or 'local'")
+    return _storage
@@ -0,0 +1,124 @@
+"""
+Latency of the assistant endpoint for commands the intent fast path answers
+versus commands that need the LLM.
+
+Seeds a manager with a few jobs and applications, then sends a mix of
+commands to `/job/my_jobs` with `--concurrency` in flight and prints a JSON
+summary per route, plus how many requests reached the model. LLM-bound
+commands are made unique so the reply cache does not answer them.
+
+    python -m benchmarks.stub_llm --port 8055 --latency-ms 800 &
+    OPENAI_BASE_URL=http://127.0.0.1:8055/v1 OPENAI_API_KEY=stub uvicorn app.main:app --port 8000
+    python -m benchmarks.agent_routing --base-url http://127.0.0.1:8000 --llm-url http://127.0.0.1:8055
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import time
+
+import httpx
+
+from benchmarks.concurrency import _login, percentile
+
+FAST_COMMANDS = [
+    "show my jobs",
+    "How many applications do I have?",
+    "applicants for job {job_id}",
+    "status breakdown for job {job_id}",
+]
+LLM_COMMANDS = [
+    "Summarize my strongest candidates",
+    "Which of my jobs should I promote next?",
+]
+
+
+def _summary(latencies: list[float]) -> dict:
+    if not latencies:
+        return {"requests": 0}
+    return {
+        "requests": len(latencies),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+    }
+
+
+async def run(base_url: str, llm_url: str | None, concurrency: int, total: int, llm_share: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        manager = await _login(client, "hiring_manager")
+        applicant = await _login(client, "applicant")
+        job_ids = []
+        for i in range(5):
+            job = {"title": f"Bench role {i}", "description": "Benchmark posting", "location": "Remote"}
+            r = await client.post("/job/post_job", json=job, headers=manager)
+            r.raise_for_status()
+            job_ids.append(r.json()["id"])
+            form = {"full_name": "Bench Applicant", "email": "applicant@example.com"}
+            (await client.post(f"/applications/apply/{job_ids[-1]}", data=form, headers=applicant)).raise_for_status()
+
+        llm_before = (await client.get(f"{llm_url}/stats")).json()["requests"] if llm_url else None
+
+        # Deterministic interleaving: every 1/llm_share-th request goes to the model.
+        llm_every = round(1 / llm_share) if llm_share > 0 else 0
+        fast = itertools.cycle(FAST_COMMANDS)
+        llm = itertools.cycle(LLM_COMMANDS)
+        plan = []
+        for i in range(total):
+            if llm_every and i % llm_every == 0:
+                plan.append(("llm", f"{next(llm)} (request {i})"))
+            else:
+                plan.append(("fast", next(fast).format(job_id=job_ids[i % len(job_ids)])))
+
+        latencies: dict[str, list[float]] = {"fast": [], "llm": []}
+        errors = 0
+        queue = iter(plan)
+
+        async def worker():
+            nonlocal errors
+            for route, command in queue:
+                start = time.perf_counter()
+                try:
+                    r = await client.post("/job/my_jobs", json={"command": command}, headers=manager)
+                    if r.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies[route].append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        llm_requests = None
+        if llm_url:
+            llm_requests = (await client.get(f"{llm_url}/stats")).json()["requests"] - llm_before
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+        "llm_requests": llm_requests,
+        "fast_path": _summary(latencies["fast"]),
+        "llm": _summary(latencies["llm"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--llm-url", default=None, help="stub_llm base URL, to count model requests")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--llm-share", type=float, default=0.2, help="fraction of commands that need the model")
+    args = parser.parse_args()
+    result = asyncio.run(run(args.base_url, args.llm_url, args.concurrency, args.requests, args.llm_share))
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
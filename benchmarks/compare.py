@@ -0,0 +1,71 @@
+"""
+Compare two benchmarks.load results and flag regressions.
+
+For each workload in both files, prints the relative change in throughput
+and p50/p95/p99 latency as JSON. A workload regresses when a latency
+percentile grows, or throughput drops, by more than `--threshold` percent,
+or when it has errors the baseline did not. Exits 1 if anything regressed,
+so it can gate CI.
+
+    python -m benchmarks.compare results/base.json results/new.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+LATENCIES = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(base: float, new: float) -> float | None:
+    if not base:
+        return None
+    return round((new - base) / base * 100, 1)
+
+
+def compare(base: dict, new: dict, threshold: float) -> dict:
+    workloads = {}
+    for name, b in base["workloads"].items():
+        n = new["workloads"].get(name)
+        if n is None:
+            continue
+        changes = {key: _change(b[key], n[key]) for key in (*LATENCIES, "throughput_rps")}
+        reasons = [
+            f"{key} +{changes[key]}%" for key in LATENCIES
+            if changes[key] is not None and changes[key] > threshold
+        ]
+        if changes["throughput_rps"] is not None and changes["throughput_rps"] < -threshold:
+            reasons.append(f"throughput_rps {changes['throughput_rps']}%")
+        if n["errors"] > b["errors"]:
+            reasons.append(f"errors {b['errors']} -> {n['errors']}")
+        workloads[name] = {
+            "base": {key: b[key] for key in (*LATENCIES, "throughput_rps", "errors")},
+            "new": {key: n[key] for key in (*LATENCIES, "throughput_rps", "errors")},
+            "change_pct": changes,
+            "regressions": reasons,
+        }
+    return {
+        "base": base["meta"].get("git_revision"),
+        "new": new["meta"].get("git_revision"),
+        "threshold_pct": threshold,
+        "workloads": workloads,
+        "regressed": sorted(name for name, w in workloads.items() if w["regressions"]),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed change in percent")
+    args = parser.parse_args()
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    result = compare(base, new, args.threshold)
+    print(json.dumps(result, indent=2))
+    return 1 if result["regressed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Concurrent-request throughput against a running API.
+
+Signs up a throwaway user, posts a few jobs, then keeps `--concurrency`
+requests in flight against `--path` until `--requests` have completed and
+prints a JSON summary. Run it against two checkouts to compare them:
+
+    uvicorn app.main:app --port 8000
+    python -m benchmarks.concurrency --base-url http://127.0.0.1:8000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+async def _login(client: httpx.AsyncClient, role: str) -> dict:
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    password = "bench-password"
+    r = await client.post("/auth/signup", json={"email": email, "password": password, "role": role})
+    r.raise_for_status()
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(base_url: str, path: str, concurrency: int, total: int, seed_jobs: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        headers = await _login(client, "hiring_manager")
+        for i in range(seed_jobs):
+            job = {"title": f"Bench job {i}", "description": "Benchmark posting", "location": "Remote"}
+            (await client.post("/job/post_job", json=job, headers=headers)).raise_for_status()
+
+        latencies: list[float] = []
+        errors = 0
+        remaining = total
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                try:
+                    r = await client.get(path, headers=headers)
+                    if r.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", default="/job/browse")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--seed-jobs", type=int, default=20)
+    args = parser.parse_args()
+    result = asyncio.run(run(args.base_url, args.path, args.concurrency, args.requests, args.seed_jobs))
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
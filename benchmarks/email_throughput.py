@@ -0,0 +1,97 @@
+"""
+Confirmation-email throughput: one SMTP session per message (what the app
+used to do) versus the pooled, batching senders in app.services.email_service.
+
+Runs a local aiosmtpd server that accepts and discards mail. `--handshake-ms`
+delays the greeting of each session, standing in for TCP and TLS setup to a
+remote relay, and `--rtt-ms` delays each MAIL/RCPT/DATA reply. Prints a JSON
+summary per mode with messages per second and sessions opened.
+
+    python -m benchmarks.email_throughput --messages 2000 --handshake-ms 150 --rtt-ms 20
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import aiosmtplib
+from aiosmtpd.controller import Controller
+
+from app.services import email_service
+from benchmarks.standins import SmtpSink
+
+
+def _message(i: int):
+    msg = email_service.EmailMessage()
+    msg["From"] = "Hiring Team <jobs@example.com>"
+    msg["To"] = f"applicant-{i}@example.com"
+    msg["Subject"] = "Application received: Benchmark role"
+    msg.set_content("Thanks for applying.\n")
+    return msg
+
+
+async def _per_message(port: int, messages: int, concurrency: int):
+    # One background task per application, each with its own session, as before.
+    gate = asyncio.Semaphore(concurrency)
+
+    async def send(i):
+        async with gate:
+            await aiosmtplib.send(_message(i), hostname="127.0.0.1", port=port, start_tls=False, timeout=20)
+
+    await asyncio.gather(*(send(i) for i in range(messages)))
+
+
+async def _pooled(port: int, messages: int, concurrency: int):
+    email_service.SMTP_HOST, email_service.SMTP_PORT = "127.0.0.1", port
+    email_service.SMTP_START_TLS = False
+    email_service.SMTP_USERNAME = email_service.SMTP_PASSWORD = None
+    email_service.EMAIL_ENABLED = True
+    await email_service.start_email_sender()
+    for i in range(messages):
+        await email_service.send_email(_message(i))
+    await email_service.stop_email_sender()
+
+
+async def run(messages: int, concurrency: int, handshake_ms: float, rtt_ms: float, port: int) -> dict:
+    results = {}
+    for name, mode in (("per_message", _per_message), ("pooled", _pooled)):
+        sink = SmtpSink(handshake_ms, rtt_ms)
+        controller = Controller(sink, hostname="127.0.0.1", port=port)
+        controller.start()
+        try:
+            started = time.perf_counter()
+            await mode(port, messages, concurrency)
+            elapsed = time.perf_counter() - started
+        finally:
+            controller.stop()
+        results[name] = {
+            "delivered": sink.messages,
+            "sessions": sink.sessions,
+            "seconds": round(elapsed, 3),
+            "messages_per_second": round(sink.messages / elapsed, 1),
+        }
+    return {
+        "messages": messages,
+        "concurrency": concurrency,
+        "smtp_connections": email_service.EMAIL_SMTP_CONNECTIONS,
+        "batch_size": email_service.EMAIL_BATCH_SIZE,
+        "handshake_ms": handshake_ms,
+        "rtt_ms": rtt_ms,
+        **results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16, help="sessions in flight for per_message")
+    parser.add_argument("--handshake-ms", type=float, default=100.0)
+    parser.add_argument("--rtt-ms", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+    result = asyncio.run(run(args.messages, args.concurrency, args.handshake_ms, args.rtt_ms, args.port))
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+CPU and peak memory of building large list responses, before and after the
+column-only row path.
+
+Seeds a throwaway schema in the database pointed to by DATABASE_URL with one
+job that has `--rows` applications and `--rows` jobs, then builds each
+response body both ways, in-process:
+
+- orm: what the list endpoints used to do. Load full ORM objects, validate
+  them into Page[ApplicationOut] with from_attributes, or run jobs through
+  jsonable_encoder, then encode the JSON.
+- rows: the service functions as they are now (selected columns as dicts),
+  encoded by FastJSONResponse.
+
+Prints a JSON summary with CPU microseconds per row (best of `--repeats`)
+and the tracemalloc peak for each case.
+
+    python -m benchmarks.list_serialization --rows 10000
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import async_engine, Base
+import app.models  # noqa: F401  registers all models
+from app.models.application import Application
+from app.models.job import Job
+from app.pagination import build_page, keyset
+from app.responses import FastJSONResponse
+from app.schemas.application import ApplicationOut
+from app.schemas.pagination import Page
+from app.services.application_service import list_applications_for_job
+from app.services.job_service import get_all_jobs
+
+SCHEMA = "list_serialization_bench"
+
+SEED_SQL = """
+INSERT INTO users (id, email, password_hash, role, created_at, updated_at)
+VALUES (gen_random_uuid(), 'manager@example.com', 'x', 'hiring_manager', now(), now());
+
+INSERT INTO users (id, email, password_hash, role, created_at, updated_at)
+SELECT gen_random_uuid(), 'applicant' || i || '@example.com', 'x', 'applicant', now(), now()
+FROM generate_series(1, :rows) i;
+
+INSERT INTO jobs (title, description, location, salary, posted_at, hiring_manager_id)
+SELECT 'Engineer ' || i, 'Build and run services ' || md5(i::text), 'City ' || (i % 50), '100k',
+       now() - i * interval '1 minute', (SELECT id FROM users WHERE role = 'hiring_manager')
+FROM generate_series(1, :rows) i;
+
+INSERT INTO applications (id, job_id, applicant_id, full_name, email, phone, cover_letter, status,
+                          submitted_at, cv_s3_key, cv_filename, cv_mime, cv_size)
+SELECT gen_random_uuid(), 1, u.id, 'Applicant ' || u.email, u.email, '+1 555 0100', repeat('Motivated. ', 20),
+       'submitted', now() - row_number() OVER () * interval '1 second',
+       'applications/' || u.id || '/cv/cv.pdf', 'cv.pdf', 'application/pdf', 120000
+FROM users u WHERE u.role = 'applicant';
+"""
+
+
+async def _applications_orm(db, job_id, limit):
+    stmt = keyset(select(Application).where(Application.job_id == job_id), Application.submitted_at, Application.id, None, limit)
+    page = build_page((await db.scalars(stmt)).all(), limit, lambda a: (a.submitted_at, a.id))
+    adapter = TypeAdapter(Page[ApplicationOut])
+    return adapter.dump_json(adapter.validate_python(page, from_attributes=True))
+
+
+async def _applications_rows(db, job_id, limit, manager):
+    return FastJSONResponse(await list_applications_for_job(db, str(job_id), manager, limit)).body
+
+
+async def _jobs_orm(db, limit):
+    stmt = keyset(select(Job), Job.posted_at, Job.id, None, limit)
+    page = build_page((await db.scalars(stmt)).all(), limit, lambda j: (j.posted_at, j.id))
+    return JSONResponse(jsonable_encoder(page)).body
+
+
+async def _jobs_rows(db, limit):
+    return FastJSONResponse(await get_all_jobs(db, limit)).body
+
+
+async def _measure(db, build, rows: int, repeats: int) -> dict:
+    best = None
+    for _ in range(repeats):
+        db.expunge_all()
+        started = time.process_time()
+        body = await build()
+        elapsed = time.process_time() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    db.expunge_all()
+    tracemalloc.start()
+    await build()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "cpu_us_per_row": round(best / rows * 1e6, 2),
+        "cpu_ms": round(best * 1000, 1),
+        "peak_mib": round(peak / 2**20, 1),
+        "body_bytes": len(body),
+    }
+
+
+async def run(rows: int, repeats: int) -> dict:
+    results = {}
+    async with async_engine.connect() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        # Only the throwaway schema is visible, so nothing touches the real tables.
+        await conn.execute(text(f"SET search_path TO {SCHEMA}"))
+        try:
+            await conn.run_sync(Base.metadata.create_all)
+            for statement in SEED_SQL.strip().split(";\n"):
+                await conn.execute(text(statement), {"rows": rows})
+            await conn.commit()
+
+            db = AsyncSession(bind=conn)
+            job = await db.scalar(select(Job).where(Job.id == 1))
+            manager = SimpleNamespace(id=job.hiring_manager_id, role="hiring_manager")
+            cases = {
+                "applications_for_job": {
+                    "orm": lambda: _applications_orm(db, job.id, rows),
+                    "rows": lambda: _applications_rows(db, job.id, rows, manager),
+                },
+                "browse_jobs": {
+                    "orm": lambda: _jobs_orm(db, rows),
+                    "rows": lambda: _jobs_rows(db, rows),
+                },
+            }
+            for name, modes in cases.items():
+                results[name] = {mode: await _measure(db, build, rows, repeats) for mode, build in modes.items()}
+            await db.close()
+        finally:
+            await conn.rollback()
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.commit()
+    await async_engine.dispose()
+    return {"rows": rows, "repeats": repeats, **results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.rows, args.repeats))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Scripted load against a running API seeded by benchmarks.seed.
+
+Workloads, run one after another with `--concurrency` requests in flight:
+
+- browse: GET /job/browse, paging up to `--pages` deep through next_cursor.
+- jobs_all: GET /job/all as a seeded manager, paging the same way.
+- applications_all: GET /applications/all, alternating seeded managers and
+  applicants, with include_cv_urls=true so CV links are signed as before.
+- apply: POST /applications/apply/{job_id} with a small PDF, as fresh
+  applicants to random jobs. 409 (already applied) is counted, not an error.
+- login: POST /auth/login with seeded credentials (bcrypt-bound).
+
+Requests are drawn from a seeded RNG, so a run is repeatable. Prints JSON with
+throughput and p50/p95/p99 latency per workload; `--output` also writes it to
+a file for benchmarks.compare.
+
+    python -m benchmarks.load --base-url http://127.0.0.1:8000 --seed-file bench-seed.json --output run.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.concurrency import percentile
+
+WORKLOADS = ["browse", "jobs_all", "applications_all", "apply", "login"]
+CV = b"%PDF-1.4\n" + b"0" * 20000 + b"\n%%EOF\n"
+
+
+class _Session:
+    """The seeded accounts the workloads act as, logged in once and shared by all workers."""
+
+    def __init__(self, client: httpx.AsyncClient, seed: dict, rng: random.Random, pages: int):
+        self.client = client
+        self.seed = seed
+        self.rng = rng
+        self.pages = pages
+        self.managers: list[dict] = []
+        self.applicants: list[dict] = []
+        self.fresh: list[tuple[int, dict]] = []
+
+    async def _token(self, email: str) -> dict:
+        r = await self.client.post("/auth/login", json={"email": email, "password": self.seed["password"]})
+        r.raise_for_status()
+        return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    async def login_pool(self, users: int):
+        """Log in `users` accounts of each kind up front; bcrypt makes logins expensive."""
+        seed = self.seed
+        manager_ids = self.rng.sample(range(seed["managers"]), min(users, seed["managers"]))
+        applicant_ids = self.rng.sample(range(seed["applicants"]), min(users, seed["applicants"]))
+        first = seed["fresh_applicant_first"]
+        fresh_ids = self.rng.sample(range(first, first + seed["fresh_applicants"]), min(users, seed["fresh_applicants"]))
+        gate = asyncio.Semaphore(4)
+
+        async def token(pattern, n):
+            async with gate:
+                return await self._token(pattern.format(n))
+
+        self.managers = await asyncio.gather(*(token(seed["manager_email"], n) for n in manager_ids))
+        self.applicants = await asyncio.gather(*(token(seed["applicant_email"], n) for n in applicant_ids))
+        self.fresh = [
+            (n, headers) for n, headers in zip(fresh_ids, await asyncio.gather(*(token(seed["applicant_email"], n) for n in fresh_ids)))
+        ]
+
+    def job_id(self) -> int:
+        low, high = self.seed["job_ids"]
+        return self.rng.randint(low, high)
+
+
+def _pager(session: _Session, path: str, headers_for, params: dict | None = None):
+    """A request function that walks `pages` deep through next_cursor, then starts over."""
+    state = {"cursor": None, "depth": 0, "headers": None}
+
+    async def request():
+        if state["cursor"] is None:
+            state["headers"] = headers_for()
+            state["depth"] = 0
+        query = {**(params or {}), **({"cursor": state["cursor"]} if state["cursor"] else {})}
+        r = await session.client.get(path, params=query or None, headers=state["headers"])
+        state["depth"] += 1
+        next_cursor = r.json().get("next_cursor") if r.status_code == 200 else None
+        state["cursor"] = next_cursor if state["depth"] < session.pages else None
+        return r
+
+    return request
+
+
+def _workload(name: str, session: _Session):
+    """Returns a factory of per-worker request functions."""
+    rng = session.rng
+    if name == "browse":
+        return lambda: _pager(session, "/job/browse", lambda: rng.choice(session.applicants))
+    if name == "jobs_all":
+        return lambda: _pager(session, "/job/all", lambda: rng.choice(session.managers))
+    if name == "applications_all":
+        turn = itertools.count()
+        return lambda: _pager(
+            session, "/applications/all",
+            lambda: rng.choice(session.managers if next(turn) % 2 else session.applicants),
+            {"include_cv_urls": "true"},
+        )
+    if name == "apply":
+        def make():
+            async def request():
+                n, headers = rng.choice(session.fresh)
+                data = {"full_name": f"Applicant {n}", "email": session.seed["applicant_email"].format(n)}
+                files = {"cv": ("cv.pdf", CV, "application/pdf")}
+                return await session.client.post(f"/applications/apply/{session.job_id()}", data=data, files=files, headers=headers)
+            return request
+        return make
+    if name == "login":
+        def make():
+            async def request():
+                if rng.random() < 0.5:
+                    email = session.seed["manager_email"].format(rng.randrange(session.seed["managers"]))
+                else:
+                    email = session.seed["applicant_email"].format(rng.randrange(session.seed["applicants"]))
+                return await session.client.post("/auth/login", json={"email": email, "password": session.seed["password"]})
+            return request
+        return make
+    raise ValueError(f"Unknown workload {name!r}")
+
+
+async def _run_workload(make_request, concurrency: int, total: int, warmup: int) -> dict:
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    errors = 0
+    remaining = warmup + total
+    # Wall-clock window of the measured requests, so warm-up does not dilute throughput.
+    window = [None, None]
+
+    async def worker():
+        nonlocal remaining, errors
+        request = make_request()
+        while remaining > 0:
+            remaining -= 1
+            measured = remaining < total
+            start = time.perf_counter()
+            try:
+                r = await request()
+                status = r.status_code
+            except httpx.HTTPError:
+                status = "transport_error"
+            finished = time.perf_counter()
+            if measured:
+                window[0] = start if window[0] is None else min(window[0], start)
+                window[1] = finished
+                latencies.append(finished - start)
+                statuses[str(status)] += 1
+                # 409 on apply is an expected collision, not a failure.
+                if status == "transport_error" or (status >= 400 and status != 409):
+                    errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = window[1] - window[0] if latencies else 0.0
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": dict(sorted(statuses.items())),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else None,
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(base_url: str, seed: dict, workloads: list[str], concurrency: int, requests: int,
+              login_requests: int, warmup: int, users: int, pages: int, rng_seed: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        session = _Session(client, seed, random.Random(rng_seed), pages)
+        await session.login_pool(users)
+        results = {}
+        for name in workloads:
+            total = login_requests if name == "login" else requests
+            results[name] = await _run_workload(_workload(name, session), concurrency, total, warmup)
+
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "base_url": base_url,
+            "concurrency": concurrency,
+            "warmup": warmup,
+            "users": users,
+            "pages": pages,
+            "rng_seed": rng_seed,
+            "data": {k: seed[k] for k in ("managers", "jobs", "applicants", "fresh_applicants", "applications")},
+        },
+        "workloads": results,
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Workload options, shared with benchmarks.suite."""
+    parser.add_argument("--workloads", default=",".join(WORKLOADS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests per workload")
+    parser.add_argument("--login-requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests before each workload")
+    parser.add_argument("--users", type=int, default=20, help="accounts of each kind to log in up front")
+    parser.add_argument("--pages", type=int, default=3, help="how deep the list workloads page")
+    parser.add_argument("--rng-seed", type=int, default=42)
+
+
+def run_with_args(base_url: str, seed: dict, args: argparse.Namespace) -> dict:
+    return asyncio.run(run(
+        base_url, seed, args.workloads.split(","), args.concurrency, args.requests,
+        args.login_requests, args.warmup, args.users, args.pages, args.rng_seed,
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--seed-file", default="bench-seed.json", help="summary written by benchmarks.seed")
+    parser.add_argument("--output", default=None)
+    add_arguments(parser)
+    args = parser.parse_args()
+    with open(args.seed_file) as f:
+        seed = json.load(f)
+    result = run_with_args(args.base_url, seed, args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Deterministic data generator for load tests.
+
+Fills the database pointed to by DATABASE_URL with `--managers` hiring
+managers, `--jobs` jobs spread evenly over them and `--applications`
+applications spread over `--applicants` applicants (each applies to distinct
+jobs). Another `--fresh-applicants` have no applications yet, for the apply
+workload. Everything is generated in set-based SQL, in batches, so millions
+of rows take minutes rather than hours.
+
+All accounts share one password. The summary that benchmarks.load needs
+(counts, account emails, password, job id range) is written to `--output`.
+
+    python -m benchmarks.seed --reset --managers 1000 --jobs 50000 --applications 2000000
+
+--reset drops and recreates every table first. Point DATABASE_URL at a
+database you can throw away.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import text
+
+from app.db import async_engine, Base
+import app.models  # noqa: F401  registers all models
+from app.security import pwd_context
+
+PASSWORD = "bench-password"
+MANAGER_EMAIL = "manager-{}@bench.example"
+APPLICANT_EMAIL = "applicant-{}@bench.example"
+STATUSES = ["submitted"] * 6 + ["reviewed", "reviewed", "shortlisted", "rejected"]
+# Each applicant's jobs are `stride` apart, which keeps them distinct while the
+# stride is coprime with the job count.
+STRIDE = 104729
+
+USERS_SQL = """
+INSERT INTO users (id, email, password_hash, role, created_at, updated_at)
+SELECT gen_random_uuid(), replace(:email, '{}', i::text), :password_hash, :role, now(), now()
+FROM generate_series(CAST(:first AS int), CAST(:last AS int)) i
+"""
+
+JOBS_SQL = """
+INSERT INTO jobs (title, description, location, salary, posted_at, hiring_manager_id)
+SELECT (ARRAY['Backend', 'Frontend', 'Data', 'Platform', 'Mobile', 'Security'])[i % 6 + 1] || ' Engineer ' || i,
+       'Build and run services for team ' || (i % 97) || '. ' || md5(i::text),
+       'City ' || (i % 50),
+       CASE WHEN i % 3 = 0 THEN NULL ELSE (80 + i % 70) || 'k' END,
+       now() - i * interval '1 minute',
+       m.id
+FROM generate_series(CAST(:first AS int), CAST(:last AS int)) i
+JOIN bench_managers m ON m.n = i % :managers
+"""
+
+APPLICATIONS_SQL = """
+INSERT INTO applications (id, job_id, applicant_id, full_name, email, phone, cover_letter, status,
+                          submitted_at, cv_s3_key, cv_filename, cv_mime, cv_size)
+SELECT gen_random_uuid(), :min_job_id + (a.n * 7919 + k * :stride) % :jobs, a.id,
+       'Applicant ' || a.n, a.email, '+1 555 0100', 'Motivated and experienced. ' || md5(a.n::text || k),
+       (CAST(:statuses AS text[]))[(a.n + k) % :status_count + 1],
+       now() - (a.n * :per_applicant + k) * interval '1 second',
+       'applications/' || a.id || '/cv/' || k || '.pdf', 'cv.pdf', 'application/pdf', 120000
+FROM bench_applicants a
+CROSS JOIN generate_series(0, CAST(:per_applicant AS int) - 1) k
+WHERE a.n BETWEEN :first AND :last AND a.n * :per_applicant + k < :applications
+ON CONFLICT ON CONSTRAINT uq_applicant_job DO NOTHING
+"""
+
+
+async def _batches(conn, sql: str, total: int, batch: int, **params):
+    for first in range(0, total, batch):
+        last = min(total, first + batch) - 1
+        await conn.execute(text(sql), {**params, "first": first, "last": last})
+        await conn.commit()
+
+
+async def seed(managers: int, jobs: int, applications: int, applicants: int, fresh: int, batch: int, reset: bool) -> dict:
+    started = time.perf_counter()
+    password_hash = pwd_context.hash(PASSWORD)
+    per_applicant = max(1, -(-applications // applicants))
+    if per_applicant > jobs:
+        raise SystemExit(f"{applicants} applicants cannot make {applications} distinct applications to {jobs} jobs")
+
+    async with async_engine.connect() as conn:
+        if reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.commit()
+
+        await _batches(conn, USERS_SQL, managers, batch, email=MANAGER_EMAIL, password_hash=password_hash, role="hiring_manager")
+        await _batches(conn, USERS_SQL, applicants + fresh, batch, email=APPLICANT_EMAIL, password_hash=password_hash, role="applicant")
+
+        # Number the seeded accounts 0..n-1 so the generators can join on arithmetic.
+        for name, pattern in (("bench_managers", MANAGER_EMAIL), ("bench_applicants", APPLICANT_EMAIL)):
+            prefix = pattern.split("{}")[0]
+            await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            await conn.execute(text(
+                f"CREATE UNLOGGED TABLE {name} AS "
+                f"SELECT id, email, CAST(split_part(substr(email, :skip), '@', 1) AS int) AS n FROM users WHERE email LIKE :like"
+            ), {"skip": len(prefix) + 1, "like": prefix + "%"})
+            await conn.execute(text(f"CREATE UNIQUE INDEX ON {name} (n)"))
+        await conn.commit()
+
+        await _batches(conn, JOBS_SQL, jobs, batch, managers=managers)
+        min_job_id, max_job_id = (await conn.execute(text("SELECT min(id), max(id) FROM jobs"))).one()
+
+        # Applicants in batches; each batch is one statement, so triggers run once per batch.
+        await _batches(
+            conn, APPLICATIONS_SQL, applicants, max(1, batch // per_applicant),
+            min_job_id=min_job_id, jobs=jobs, stride=STRIDE, statuses=STATUSES, status_count=len(STATUSES),
+            per_applicant=per_applicant, applications=applications,
+        )
+        seeded = (await conn.execute(text("SELECT count(*) FROM applications"))).scalar()
+
+        await conn.execute(text("DROP TABLE bench_managers, bench_applicants"))
+        await conn.commit()
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE"))
+    await async_engine.dispose()
+
+    return {
+        "managers": managers,
+        "jobs": jobs,
+        "applicants": applicants,
+        "fresh_applicants": fresh,
+        "applications": seeded,
+        "password": PASSWORD,
+        "manager_email": MANAGER_EMAIL,
+        "applicant_email": APPLICANT_EMAIL,
+        # Fresh applicants are numbered after the ones with applications.
+        "fresh_applicant_first": applicants,
+        "job_ids": [min_job_id, max_job_id],
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--managers", type=int, default=1000)
+    parser.add_argument("--jobs", type=int, default=50000)
+    parser.add_argument("--applications", type=int, default=2000000)
+    parser.add_argument("--applicants", type=int, default=None, help="default: one per 20 applications")
+    parser.add_argument("--fresh-applicants", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=50000, help="rows per INSERT statement")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    parser.add_argument("--output", default="bench-seed.json")
+    args = parser.parse_args()
+    applicants = args.applicants or max(1, args.applications // 20)
+    result = asyncio.run(seed(
+        args.managers, args.jobs, args.applications, applicants, args.fresh_applicants, args.batch, args.reset,
+    ))
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Local stand-ins for the services the API talks to, so benchmarks run offline
+and repeatably:
+
+- OpenAI: benchmarks.stub_llm, served on `--llm-port`.
+- SMTP: an aiosmtpd server that accepts and discards mail, on `--smtp-port`.
+- S3: moto's S3 server with the CV bucket created, on `--s3-port`.
+
+Run on its own, it prints the environment for an API server and keeps the
+stand-ins up until interrupted:
+
+    python -m benchmarks.standins > /tmp/standins.env
+    env $(cat /tmp/standins.env) uvicorn app.main:app
+
+Needs `aiosmtpd` and `moto[server]` (benchmark-only dependencies).
+"""
+import argparse
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import uvicorn
+
+from benchmarks.stub_llm import create_app
+
+BUCKET = "bench-cvs"
+REGION = "eu-north-1"
+
+
+class SmtpSink:
+    """aiosmtpd handler that accepts everything. Delays stand in for a remote relay."""
+
+    def __init__(self, handshake_ms: float = 0.0, rtt_ms: float = 0.0):
+        self.handshake = handshake_ms / 1000
+        self.rtt = rtt_ms / 1000
+        self.sessions = 0
+        self.messages = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        await asyncio.sleep(self.handshake)
+        session.host_name = hostname
+        return responses
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        await asyncio.sleep(self.rtt)
+        envelope.mail_from = address
+        return "250 OK"
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        await asyncio.sleep(self.rtt)
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.rtt)
+        self.messages += 1
+        return "250 Message accepted"
+
+
+def _serve_llm(port: int, latency_ms: float) -> uvicorn.Server:
+    config = uvicorn.Config(create_app(latency_ms, 8, 50.0), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def _serve_s3(port: int):
+    try:
+        import boto3
+        from moto.server import ThreadedMotoServer
+    except ImportError as e:
+        raise RuntimeError("The S3 stand-in needs moto[server]: pip install 'moto[server]'") from e
+    # Keep moto's per-request access log out of the benchmark output.
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    boto3.client(
+        "s3",
+        region_name=REGION,
+        endpoint_url=f"http://127.0.0.1:{port}",
+        aws_access_key_id="bench",
+        aws_secret_access_key="bench",
+    ).create_bucket(Bucket=BUCKET, CreateBucketConfiguration={"LocationConstraint": REGION})
+    return server
+
+
+@contextmanager
+def standins(llm_port: int = 8055, smtp_port: int = 8025, s3_port: int = 5055, llm_latency_ms: float = 800.0):
+    """Start all stand-ins and yield the environment overrides for the API server."""
+    from aiosmtpd.controller import Controller
+
+    llm = _serve_llm(llm_port, llm_latency_ms)
+    smtp = Controller(SmtpSink(), hostname="127.0.0.1", port=smtp_port)
+    smtp.start()
+    s3 = _serve_s3(s3_port)
+    try:
+        yield {
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+            "OPENAI_API_KEY": "stub",
+            "EMAIL_ENABLED": "true",
+            "SMTP_HOST": "127.0.0.1",
+            "SMTP_PORT": str(smtp_port),
+            "SMTP_START_TLS": "false",
+            "SMTP_USERNAME": "",
+            "SMTP_PASSWORD": "",
+            "SMTP_FROM_EMAIL": "jobs@bench.example",
+            "STORAGE_BACKEND": "s3",
+            "S3_ENDPOINT_URL": f"http://127.0.0.1:{s3_port}",
+            "S3_BUCKET_NAME": BUCKET,
+            "AWS_REGION": REGION,
+            "AWS_ACCESS_KEY_ID": "bench",
+            "AWS_SECRET_ACCESS_KEY": "bench",
+        }
+    finally:
+        s3.stop()
+        smtp.stop()
+        llm.should_exit = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-port", type=int, default=8055)
+    parser.add_argument("--smtp-port", type=int, default=8025)
+    parser.add_argument("--s3-port", type=int, default=5055)
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    args = parser.parse_args()
+    with standins(args.llm_port, args.smtp_port, args.s3_port, args.llm_latency_ms) as env:
+        for name, value in env.items():
+            print(f"{name}={value}", flush=True)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Offline stand-in for the OpenAI chat completions API, so the assistant can be
+benchmarked without network access or token costs.
+
+Every request waits `--latency-ms` (the model's time to first token) and then
+returns a canned reply, streamed in `--chunks` pieces `--chunk-delay-ms` apart
+when the client asks for a stream. It never calls tools.
+
+    python -m benchmarks.stub_llm --port 8055 --latency-ms 800
+    OPENAI_BASE_URL=http://127.0.0.1:8055/v1 OPENAI_API_KEY=stub uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+REPLY = "Here is what I found for your request."
+
+
+def create_app(latency_ms: float, chunks: int, chunk_delay_ms: float) -> FastAPI:
+    app = FastAPI()
+    app.state.requests = 0
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        usage = {"prompt_tokens": 1, "completion_tokens": chunks, "total_tokens": chunks + 1}
+        await asyncio.sleep(latency_ms / 1000)
+
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        words = REPLY.split(" ")
+        size = max(1, -(-len(words) // chunks))
+        pieces = [" ".join(words[i:i + size]) + " " for i in range(0, len(words), size)]
+
+        def chunk(delta: dict, finish_reason: str | None = None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body.get("model"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            for piece in pieces:
+                yield chunk({"role": "assistant", "content": piece})
+                await asyncio.sleep(chunk_delay_ms / 1000)
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8055)
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--chunks", type=int, default=8)
+    parser.add_argument("--chunk-delay-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    app = create_app(args.latency_ms, args.chunks, args.chunk_delay_ms)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
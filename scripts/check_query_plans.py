@@ -0,0 +1,173 @@
+"""
+EXPLAIN regression check for the service-layer list queries.
+
+Seeds a throwaway schema in the database pointed to by DATABASE_URL, calls the
+real service functions, captures the SQL they send and runs EXPLAIN on each
+statement. Exits non-zero if a plan falls back to a sequential scan on jobs or
+applications, or sorts where an index should already provide the order.
+
+    python -m scripts.check_query_plans
+"""
+import asyncio
+import json
+import sys
+from types import SimpleNamespace
+
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import async_engine, Base
+import app.models  # noqa: F401  registers all models
+from app.models.application import Application
+from app.models.job import Job
+from app.models.user import User
+from app.pagination import encode_cursor
+from app.services.application_service import (
+    list_my_applications,
+    list_applications_for_job,
+    get_all_user_applications,
+)
+from app.services.job_service import get_all_jobs, get_jobs_for_manager, list_jobs_for_applicant, search_jobs, get_job_dashboard
+from app.services.intent_service import answer_intent
+
+SCHEMA = "explain_check"
+MANAGERS = 200
+APPLICANTS = 500
+JOBS = 20000
+APPLICATIONS_PER_APPLICANT = 200
+POPULAR_JOBS = 200
+PAGE = 20
+
+SEED_SQL = f"""
+INSERT INTO users (id, email, password_hash, role, created_at, updated_at)
+SELECT gen_random_uuid(), 'manager' || i || '@example.com', 'x', 'hiring_manager', now(), now()
+FROM generate_series(1, {MANAGERS}) i;
+
+INSERT INTO users (id, email, password_hash, role, created_at, updated_at)
+SELECT gen_random_uuid(), 'applicant' || i || '@example.com', 'x', 'applicant', now(), now()
+FROM generate_series(1, {APPLICANTS}) i;
+
+INSERT INTO jobs (title, description, location, salary, posted_at, hiring_manager_id)
+SELECT 'Engineer ' || i, 'Build and run services ' || md5(i::text), 'City ' || (i % 50), NULL,
+       now() - i * interval '1 minute', m.id
+FROM generate_series(1, {JOBS}) i
+JOIN LATERAL (
+    SELECT id FROM users WHERE role = 'hiring_manager' ORDER BY email OFFSET (i % {MANAGERS}) LIMIT 1
+) m ON true;
+
+-- Applications pile up on a few popular jobs, as they do in production.
+-- 7919 is coprime with their count, so each applicant still gets distinct jobs.
+INSERT INTO applications (id, job_id, applicant_id, full_name, email, status, submitted_at)
+SELECT gen_random_uuid(), (i * 7919) % {POPULAR_JOBS} + 1, a.id, 'Applicant ' || i, 'a' || i || '@example.com',
+       'submitted', now() - i * interval '1 second'
+FROM generate_series(0, {APPLICANTS * APPLICATIONS_PER_APPLICANT - 1}) i
+JOIN (
+    SELECT id, row_number() OVER (ORDER BY email) - 1 AS n FROM users WHERE role = 'applicant'
+) a ON a.n = i / {APPLICATIONS_PER_APPLICANT};
+"""
+
+# Plans that must sort by construction: ordering spans several jobs or is by rank.
+# Status counts (intents, dashboard totals) sort per-job counter rows, not applications.
+ALLOW_SORT = {"get_all_user_applications[hiring_manager]", "search_jobs", "get_job_dashboard", "intent[status_counts]", "intent[job_status_counts]"}
+SCANNED_TABLES = {"jobs", "applications"}
+
+
+def _problems(plan: dict, allow_sort: bool) -> list[str]:
+    found = []
+    node = plan["Node Type"]
+    if node == "Seq Scan" and plan.get("Relation Name") in SCANNED_TABLES:
+        found.append(f"Seq Scan on {plan['Relation Name']}")
+    if node in ("Sort", "Incremental Sort") and not allow_sort:
+        found.append(f"{node} on {', '.join(plan.get('Sort Key', []))}")
+    for child in plan.get("Plans", []):
+        found.extend(_problems(child, allow_sort))
+    return found
+
+
+def _capture(conn, statements):
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    sync_conn = conn.sync_connection
+    event.listen(sync_conn, "before_cursor_execute", before_cursor_execute)
+    return lambda: event.remove(sync_conn, "before_cursor_execute", before_cursor_execute)
+
+
+async def _cases(db: AsyncSession):
+    applicant_id = await db.scalar(select(User.id).where(User.role == "applicant").order_by(User.email))
+    job = await db.scalar(select(Job).where(Job.id == 1))
+    manager_id = job.hiring_manager_id
+    newest = await db.scalar(select(Job).order_by(Job.posted_at.desc()).offset(PAGE))
+    app = await db.scalar(select(Application).order_by(Application.submitted_at.desc()).offset(PAGE))
+
+    manager = SimpleNamespace(id=manager_id, role="hiring_manager")
+    applicant = SimpleNamespace(id=applicant_id, role="applicant")
+    job_cursor = encode_cursor(newest.posted_at, newest.id)
+    app_cursor = encode_cursor(app.submitted_at, app.id)
+
+    return {
+        "get_all_jobs": lambda: get_all_jobs(db, PAGE),
+        "get_all_jobs[cursor]": lambda: get_all_jobs(db, PAGE, job_cursor),
+        "get_jobs_for_manager": lambda: get_jobs_for_manager(db, manager_id, PAGE, job_cursor),
+        "list_jobs_for_applicant": lambda: list_jobs_for_applicant(db, applicant_id, PAGE, job_cursor),
+        "search_jobs": lambda: search_jobs(db, "engineer 4242", PAGE),
+        "get_job_dashboard": lambda: get_job_dashboard(db, manager_id, PAGE, job_cursor),
+        "list_my_applications": lambda: list_my_applications(db, applicant, PAGE, app_cursor),
+        "list_applications_for_job": lambda: list_applications_for_job(db, str(job.id), manager, PAGE, app_cursor),
+        "get_all_user_applications[applicant]": lambda: get_all_user_applications(db, applicant, PAGE, app_cursor),
+        "get_all_user_applications[hiring_manager]": lambda: get_all_user_applications(db, manager, PAGE, app_cursor),
+        "intent[list_jobs]": lambda: answer_intent(db, "show my jobs", manager_id),
+        "intent[job_applicants]": lambda: answer_intent(db, f"applicants for job {job.id}", manager_id),
+        "intent[status_counts]": lambda: answer_intent(db, "how many applications", manager_id),
+        "intent[job_status_counts]": lambda: answer_intent(db, f"status breakdown for job {job.id}", manager_id),
+    }
+
+
+async def main() -> int:
+    failures = 0
+    async with async_engine.connect() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        # Only the throwaway schema is visible, so nothing touches the real tables.
+        await conn.execute(text(f"SET search_path TO {SCHEMA}"))
+        try:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(text(SEED_SQL))
+            await conn.commit()
+            # VACUUM flushes the GIN pending list so the search index is costed realistically.
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("VACUUM ANALYZE"))
+            await conn.commit()
+            await conn.execution_options(isolation_level="READ COMMITTED")
+
+            db = AsyncSession(bind=conn)
+            for name, call in (await _cases(db)).items():
+                statements = []
+                stop = _capture(conn, statements)
+                try:
+                    await call()
+                finally:
+                    stop()
+
+                for statement, parameters in statements:
+                    result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+                    plan = result.scalar()[0]["Plan"]
+                    problems = _problems(plan, name in ALLOW_SORT)
+                    status = "FAIL" if problems else "ok"
+                    print(f"{status:4} {name}: {statement.strip().split(chr(10))[0][:80]}")
+                    for problem in problems:
+                        print(f"       {problem}")
+                    failures += bool(problems)
+            await db.close()
+        finally:
+            await conn.rollback()
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.commit()
+    await async_engine.dispose()
+
+    print(json.dumps({"failures": failures}))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,63 @@
+"""
+Recount job_status_counts from applications.
+
+The triggers keep the counters exact, so this is for repair: after restoring
+from a backup, bulk loads with triggers disabled, or a manual fix. Compares
+the stored counters with a fresh count and, unless --check is given, replaces
+them in one transaction. Application writes wait on the table lock while it
+runs; reads do not.
+
+Prints a JSON summary. With --check, exits non-zero if anything drifted.
+
+    python -m scripts.rebuild_job_status_counts [--check]
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from sqlalchemy import text
+
+from app.db import async_engine
+from app.models.job_status_count import REBUILD_JOB_STATUS_COUNTS_SQL
+
+DRIFT_SQL = """
+WITH actual AS (
+    SELECT job_id, status, count(*) AS count FROM applications GROUP BY job_id, status
+)
+SELECT coalesce(a.job_id, c.job_id) AS job_id, coalesce(a.status, c.status) AS status,
+       coalesce(c.count, 0) AS stored, coalesce(a.count, 0) AS actual
+FROM actual a
+FULL JOIN (SELECT * FROM job_status_counts WHERE count <> 0) c ON c.job_id = a.job_id AND c.status = a.status
+WHERE coalesce(c.count, 0) <> coalesce(a.count, 0)
+ORDER BY 1, 2
+"""
+
+
+async def rebuild(check: bool) -> dict:
+    async with async_engine.begin() as conn:
+        # SHARE blocks application writes (and their triggers) until commit, not reads.
+        await conn.execute(text("LOCK TABLE applications IN SHARE MODE"))
+        drift = (await conn.execute(text(DRIFT_SQL))).all()
+        if not check:
+            await conn.execute(text("DELETE FROM job_status_counts"))
+            await conn.execute(text(REBUILD_JOB_STATUS_COUNTS_SQL))
+    await async_engine.dispose()
+    return {
+        "drifted": len(drift),
+        "rebuilt": not check,
+        "sample": [dict(r._mapping) for r in drift[:20]],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="report drift without changing anything")
+    args = parser.parse_args()
+    result = asyncio.run(rebuild(args.check))
+    print(json.dumps(result))
+    return 1 if args.check and result["drifted"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
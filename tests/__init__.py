@@ -0,0 +1,4 @@
+import os
+
+# The engines connect lazily; tests that never query only need a URL to build them.
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg2://localhost/test")
@@ -0,0 +1,21 @@
+import unittest
+
+from app.services.intent_service import answer_intent, match_intent
+
+
+class _NoDatabase:
+    async def execute(self, *args, **kwargs):
+        raise AssertionError("queried the database")
+
+
+class OutOfRangeJobIdTest(unittest.IsolatedAsyncioTestCase):
+    async def test_job_id_beyond_integer_falls_back_to_agent(self):
+        # Larger than a Postgres integer: the query would fail with DataError.
+        for command in ("applicants for job 99999999999", "status counts for job #2147483648"):
+            with self.subTest(command=command):
+                self.assertIsNotNone(match_intent(command))
+                self.assertIsNone(await answer_intent(_NoDatabase(), command, "manager"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import patch
+
+from fastapi import HTTPException
+
+from app.services import job_import_service
+from app.services.job_import_service import _csv_records
+
+HEADER = "title,description,location\n"
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+class CsvRecordsTest(unittest.IsolatedAsyncioTestCase):
+    async def records(self, text: str, size: int = 3):
+        return [record async for record in _csv_records(_chunks(text.encode(), size))]
+
+    async def test_unbalanced_quotes_in_unquoted_fields(self):
+        # A quote inside an unquoted field is literal; an odd count on a line
+        # does not open a field that spans lines.
+        text = HEADER + 'Buy 24" monitor,a,Remote\nSupport,b,Berlin\nSell 27" screen,c,Paris\n'
+        for size in (1, 7, len(text)):
+            with self.subTest(size=size):
+                self.assertEqual(await self.records(text, size), [
+                    (2, {"title": 'Buy 24" monitor', "description": "a", "location": "Remote"}),
+                    (3, {"title": "Support", "description": "b", "location": "Berlin"}),
+                    (4, {"title": 'Sell 27" screen', "description": "c", "location": "Paris"}),
+                ])
+
+    async def test_stray_quote_alone(self):
+        records = await self.records(HEADER + 'A 5" tablet,a,Remote\n')
+        self.assertEqual(records, [(2, {"title": 'A 5" tablet', "description": "a", "location": "Remote"})])
+
+    async def test_quoted_field_across_lines(self):
+        records = await self.records(HEADER + '"Two\nlines, ""quoted""",a,Remote\nNext,b,Berlin')
+        self.assertEqual(records, [
+            (2, {"title": 'Two\nlines, "quoted"', "description": "a", "location": "Remote"}),
+            (4, {"title": "Next", "description": "b", "location": "Berlin"}),
+        ])
+
+    async def test_unterminated_quoted_field(self):
+        with self.assertRaises(HTTPException) as ctx:
+            await self.records(HEADER + 'Ok,a,Remote\n"Open,b,Berlin\nMore,c,Paris\n')
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertIn("line 3", ctx.exception.detail)
+
+    async def test_record_limit_applies_across_lines(self):
+        text = HEADER + '"' + "x\n" * 20 + '",a,Remote\n'
+        with patch.object(job_import_service, "JOB_IMPORT_MAX_RECORD_CHARS", 30):
+            with self.assertRaises(HTTPException) as ctx:
+                await self.records(text)
+        self.assertEqual(ctx.exception.status_code, 413)
+        self.assertIn("line 2", ctx.exception.detail)
+
+
+if __name__ == "__main__":
+    unittest.main()